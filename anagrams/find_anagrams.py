@@ -1,46 +1,182 @@
-from typing import List, Dict
-from tqdm import tqdm
+import heapq
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations, product
+from typing import List, Dict, Tuple, Iterator, Iterable, Optional
+from tqdm import tqdm
 from utils.word_validation import is_cyrillic
+from utils.lexicon import Lexicon
+
+
+# Letter counts are packed into one integer, `width` bits per distinct letter of
+# the phrase with the highest bit of every field being a guard. Subtracting word
+# from remaining letters is then a single big-int subtraction: a field which
+# would go negative borrows its guard bit, so word fits iff all guards survive.
+
+
+class _LetterVectors:
+    def __init__(self, anagram_decomposed: Counter):
+        self.letters = {letter: i for i, letter in enumerate(sorted(anagram_decomposed))}
+        self.width = max(anagram_decomposed.values()).bit_length() + 1
+        self.guards = sum(1 << (i * self.width + self.width - 1) for i in range(len(self.letters)))
+        self.source = self.pack(anagram_decomposed)
+
+    def pack(self, counts: Counter) -> int:
+        return sum(count << (self.letters[letter] * self.width) for letter, count in counts.items())
+
+    def subtract(self, remaining: int, vector: int) -> int:
+        """
+        Returns remaining - vector, or -1 if vector doesn't fit
+        """
+        diff = (remaining | self.guards) - vector
+        if diff & self.guards != self.guards:
+            return -1
+        return diff ^ self.guards
+
+
+def _search_signature_combinations(
+        vectors: _LetterVectors,
+        groups: List[Tuple[int, int, int]],
+        total_letters: int,
+        max_words: int,
+        first_groups: Optional[Iterable[int]] = None) -> Iterator[List[Tuple[int, int]]]:
+    """
+    Single DFS over distinct letter signatures (vector, letters count, group size),
+    yields every combination of (group index, multiplicity) using all letters
+    with at most max_words words, whatever number of words it takes.
+    `first_groups` restricts the outermost choice, so search can be sharded.
+    """
+    max_word_length = max((length for _, length, _ in groups), default=0)
+    chosen: List[Tuple[int, int]] = []
+
+    def choose(g: int, remaining: int, remaining_length: int, words_left: int):
+        vector, length, group_size = groups[g]
+        new_remaining = remaining
+        for multiplicity in range(1, min(group_size, words_left) + 1):
+            new_remaining = vectors.subtract(new_remaining, vector)
+            if new_remaining < 0:
+                break
+            new_length = remaining_length - multiplicity * length
+            chosen.append((g, multiplicity))
+            if new_remaining == 0:
+                yield list(chosen)
+            # the rest should be coverable by words left
+            elif new_length <= max_word_length * (words_left - multiplicity):
+                for next_g in range(g + 1, len(groups)):
+                    yield from choose(next_g, new_remaining, new_length, words_left - multiplicity)
+            chosen.pop()
+
+    if first_groups is None:
+        first_groups = range(len(groups))
+    for g in first_groups:
+        yield from choose(g, vectors.source, total_letters, max_words)
+
 
+class _AnagramSearch:
+    def __init__(self, anagram_source: str, all_words: List[str], min_words: int = 2, max_words: int = 4):
+        self.all_words = all_words
+        self.min_words = min_words
+        self.max_words = max_words
+        anagram_source = anagram_source.lower()
+        self.anagram_decomposed = Counter([l for l in anagram_source if is_cyrillic(l)])
+        self.total_letters = sum(self.anagram_decomposed.values())
+        self.vectors = _LetterVectors(self.anagram_decomposed)
 
-def _find_anagrams_with_depth(anagram_source: str, all_words: List[str], maxdepth):
-    anagram_source = anagram_source.lower()
-    if maxdepth < 1:
-        maxdepth = 1
+        # Words sharing letter multiset are interchangeable, search goes over
+        # signatures only and expands them to words at the end
+        self.positions_by_signature: Dict[int, List[int]] = {}
+        for position, word in enumerate(all_words):
+            counts = Counter(word)
+            # checked before packing: a count too large for its field would spill into the next one
+            if any(count > self.anagram_decomposed[letter] for letter, count in counts.items()):
+                continue
+            vector = self.vectors.pack(counts)
+            self.positions_by_signature.setdefault(vector, []).append(position)
+        self.signatures = list(self.positions_by_signature.keys())
+        self.groups = [(vector, len(all_words[positions[0]]), len(positions))
+                       for vector, positions in self.positions_by_signature.items()]
 
-    anagram_decomposed = Counter([l for l in anagram_source if is_cyrillic(l)])
-    letters_present = anagram_decomposed.keys()
-    eligible_words = [word for word in all_words if all((letter in letters_present for letter in word))]
-    possible_parts = []
+    def search(self, first_groups: Optional[Iterable[int]] = None) -> Iterator[List[Tuple[int, int]]]:
+        return _search_signature_combinations(
+            self.vectors, self.groups, self.total_letters, self.max_words, first_groups)
 
-    def search_for_anagrams_inner(words: List[str],
-                                  words_decomposed: Counter, depth: int, current_path=List[str]):
-        for j, word in enumerate(words):
-            new_words_decomposed = words_decomposed + Counter([l for l in word if is_cyrillic(l)])
-            new_current_path = current_path + [word]
-            if depth < maxdepth:
-                if any(new_words_decomposed[letter] > value for letter, value in anagram_decomposed.items()):
-                    continue  # already too much certain letters - optimization
-                search_for_anagrams_inner(words[j + 1:], new_words_decomposed, depth + 1, new_current_path)
-            else:
-                if new_words_decomposed == anagram_decomposed:
-                    possible_parts.append(new_current_path)
+    def expand(self, combination: List[Tuple[int, int]]) -> Iterator[Tuple[int, ...]]:
+        """
+        Yields sorted word positions for every way to pick words
+        for combination of signatures
+        """
+        if sum(multiplicity for _, multiplicity in combination) < self.min_words:
+            return
+        choices = [combinations(self.positions_by_signature[self.signatures[g]], multiplicity)
+                   for g, multiplicity in combination]
+        for chosen_positions in product(*choices):
+            yield tuple(sorted(p for positions in chosen_positions for p in positions))
 
-    for i, word in tqdm(enumerate(eligible_words), total=len(eligible_words)):
-        words_decomposed = Counter([l for l in word if is_cyrillic(l)])
-        current_path = [word]
-        search_for_anagrams_inner(eligible_words[i + 1:], words_decomposed, 1, current_path)
+    def shards(self, count: int) -> List[List[int]]:
+        """
+        Splits outermost choices into `count` shards of about equal work.
+        Signature can be combined only with the ones after it, so subtree
+        of g-th signature is estimated as (signatures after it) ^ (words left)
+        """
+        estimates = [(len(self.groups) - g) ** (self.max_words - 1) for g in range(len(self.groups))]
+        loads = [(0, i) for i in range(count)]
+        shards = [[] for _ in range(count)]
+        for g in sorted(range(len(self.groups)), key=lambda g: -estimates[g]):
+            load, i = heapq.heappop(loads)
+            shards[i].append(g)
+            heapq.heappush(loads, (load + estimates[g], i))
+        return [sorted(shard) for shard in shards if shard]
 
-    return possible_parts
 
+_worker_search: Optional[_AnagramSearch] = None
 
-def find_anagrams(all_words_by_class: Dict[str, List[str]], anagram_source: str):
+
+def _init_worker(search: _AnagramSearch):
+    global _worker_search
+    _worker_search = search
+
+
+def _search_shard(first_groups: List[int]) -> List[List[Tuple[int, int]]]:
+    return list(_worker_search.search(first_groups))
+
+
+def iterate_anagrams(lexicon: Lexicon, anagram_source: str, workers: int = 1) -> Iterator[List[str]]:
+    """
+    Yields anagrams as lists of nouns. With single worker yields them
+    sorted (fewer words first), otherwise search is sharded between
+    processes and anagrams are yielded as soon as their shard is done
+    """
+    if not any([is_cyrillic(l) for l in anagram_source]):
+        raise RuntimeError("Found non cyrillic symbol or space or hyphen")
+    nouns = [w for w in lexicon["nouns"] if 3 <= len(w) <= 7]
+    search = _AnagramSearch(anagram_source, nouns)
+
+    if workers <= 1:
+        results_by_depth: Dict[int, List[Tuple[int, ...]]] = {}
+        for combination in tqdm(search.search()):
+            for positions in search.expand(combination):
+                results_by_depth.setdefault(len(positions), []).append(positions)
+        # Same order as exhaustive search over word indices would give
+        for words_count in sorted(results_by_depth):
+            for positions in sorted(results_by_depth[words_count]):
+                yield [nouns[p] for p in positions]
+        return
+
+    # several shards per worker so that estimation errors even out
+    shards = search.shards(workers * 4)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(search,)) as executor:
+        futures = [executor.submit(_search_shard, shard) for shard in shards]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Shards"):
+            for combination in future.result():
+                for positions in search.expand(combination):
+                    yield [nouns[p] for p in positions]
+
+
+def find_anagrams(lexicon: Lexicon, anagram_source: str, workers: int = 1):
     """
     Finds all possible ways to split phrase into into multiple (2-4) nouns
-    forming anagram of that phrase. Caution: works way to long for phrases
-    longer than 20 letters, but may not find anything for phrases of less
-    than 10 letters. Example:
+    forming anagram of that phrase. Phrases of 25-30 letters are fine,
+    but may not find anything for phrases of less than 10 letters. Example:
     фиолетовая антилопа
     ---
     тело,фон,апатия,виола
@@ -49,10 +185,4 @@ def find_anagrams(all_words_by_class: Dict[str, List[str]], anagram_source: str)
     тело,фото,алия,павиан
     ...
     """
-    if not any([is_cyrillic(l) for l in anagram_source]):
-        raise RuntimeError("Found non cyrillic symbol or space or hyphen")
-    nouns = [w for w in all_words_by_class["nouns"] if 3 <= len(w) <= 7]
-    possible_parts = _find_anagrams_with_depth(anagram_source, nouns, 1) \
-                     + _find_anagrams_with_depth(anagram_source, nouns, 2) \
-                     + _find_anagrams_with_depth(anagram_source, nouns, 3)
-    return "\n".join([",".join(parts) for parts in possible_parts])
+    return "\n".join([",".join(parts) for parts in iterate_anagrams(lexicon, anagram_source, workers)])
@@ -0,0 +1,232 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Iterator, Iterable, Sequence, Tuple
+
+from utils.language import Language
+from utils.lexicon import letters_signature
+from utils.words_cache import WordsCache
+
+__all__ = ["SignatureIndex", "open_signature_index", "find_words_from_letters", "find_exact_anagrams", "BLANKS"]
+
+
+# Characters standing for a blank tile (any single letter) in queries
+BLANKS = "?*"
+
+# Saved index. Layout (all numbers are little-endian):
+#   header:      magic, format version, signatures count, signatures blob size
+#   offsets:     uint32[signatures count + 1] - byte offsets of word groups in words blob
+#   signatures:  UTF-8 sorted signatures separated by "\n", padded to 4 bytes
+#   words:       UTF-8 words of every signature separated by " "
+# Only signatures are decoded on opening, words of a signature are decoded when it matches.
+_MAGIC = b"PZSG"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+
+
+def _pad4(size: int) -> int:
+    return (size + 3) & ~3
+
+
+class _PackedGroups(Sequence):
+    """
+    Word groups of saved index, decoded from mapped memory one by one
+    """
+    def __init__(self, buffer, offsets: array, start: int):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._start = start
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx: int) -> List[str]:
+        begin, end = self._start + self._offsets[idx], self._start + self._offsets[idx + 1]
+        return self._buffer[begin:end].decode("utf-8").split(" ")
+
+
+class SignatureIndex:
+    """
+    Words by letter signature (sorted letters, see `letters_signature`).
+    Signatures are kept sorted, so exact anagrams are a binary search and
+    signatures sharing a prefix form a contiguous range - a trie node.
+    For words which can be built from given letters the ranges are walked
+    like a trie: signature letters are sorted, so branch is dropped as soon
+    as its next letter is neither left in query nor can be covered by a blank.
+    """
+    def __init__(self, signatures: List[str], groups: Sequence[List[str]]):
+        self.signatures = signatures
+        self.groups = groups
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "SignatureIndex":
+        words_by_signature: Dict[str, List[str]] = {}
+        seen = set()
+        for word in words:
+            # words are separated by spaces in saved index
+            if word and " " not in word and word not in seen:
+                seen.add(word)
+                words_by_signature.setdefault(letters_signature(word), []).append(word)
+        signatures = sorted(words_by_signature)
+        return cls(signatures, [words_by_signature[signature] for signature in signatures])
+
+    @classmethod
+    def load(cls, filepath: Path) -> "SignatureIndex":
+        """
+        Opens saved index, word groups stay in mapped memory
+        """
+        with open(filepath, "rb") as fh:
+            buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, signatures_size = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"{str(filepath)} is not a signature index of version {_FORMAT_VERSION}")
+        cursor = _HEADER.size
+        offsets = array("I", buffer[cursor:cursor + 4 * (count + 1)])
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        cursor += 4 * (count + 1)
+        signatures = buffer[cursor:cursor + signatures_size].decode("utf-8").split("\n") if count else []
+        cursor += _pad4(signatures_size)
+        return cls(signatures, _PackedGroups(buffer, offsets, cursor))
+
+    def save(self, filepath: Path) -> None:
+        offsets, words_blob = array("I", [0]), bytearray()
+        for words in self.groups:
+            words_blob += " ".join(words).encode("utf-8")
+            offsets.append(len(words_blob))
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        signatures_blob = "\n".join(self.signatures).encode("utf-8")
+        tmp_filepath = filepath.with_name(filepath.name + ".tmp")
+        with open(tmp_filepath, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(self.signatures), len(signatures_blob)))
+            fh.write(offsets.tobytes())
+            fh.write(signatures_blob)
+            fh.write(b"\0" * (_pad4(len(signatures_blob)) - len(signatures_blob)))
+            fh.write(words_blob)
+        os.replace(tmp_filepath, filepath)
+
+    def words_of(self, signature: str) -> List[str]:
+        idx = bisect_left(self.signatures, signature)
+        if idx < len(self.signatures) and self.signatures[idx] == signature:
+            return list(self.groups[idx])
+        return []
+
+    def anagrams(self, letters: str) -> List[str]:
+        """
+        Words made of exactly these letters, every blank ("?" or "*")
+        may stand for any letter
+        """
+        letters, blanks = _parse_query(letters)
+        if blanks:
+            return self.sub_anagrams(letters + "?" * blanks, len(letters) + blanks)
+        return self.words_of(letters_signature(letters))
+
+    def sub_anagrams(self, letters: str, min_length: int = 1) -> List[str]:
+        """
+        Words which can be made of some of these letters, every blank
+        ("?" or "*") may stand for any letter. Longest words go first.
+        """
+        letters, blanks = _parse_query(letters)
+        found = list(self._search(0, len(self.signatures), 0, Counter(letters), blanks, min_length))
+        found.sort(key=lambda item: -item[0])
+        return [word for _, idx in found for word in self.groups[idx]]
+
+    def _search(self, lo: int, hi: int, depth: int, counts: Counter, blanks: int,
+                min_length: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yields (length, signature idx) for signatures in [lo, hi), all of
+        which share their first `depth` letters
+        """
+        signatures = self.signatures
+        # the shortest signature of range is its prefix itself and goes first
+        if lo < hi and len(signatures[lo]) == depth:
+            if depth >= min_length:
+                yield depth, lo
+            lo += 1
+        if depth + sum(counts.values()) + blanks < min_length:
+            return
+        while lo < hi:
+            prefix = signatures[lo][:depth + 1]
+            letter = prefix[-1]
+            if counts[letter] <= 0 and not blanks:
+                # jump straight to the next letter still left in query
+                following = [l for l, count in counts.items() if count > 0 and l > letter]
+                if not following:
+                    return
+                lo = bisect_left(signatures, prefix[:-1] + min(following), lo, hi)
+                continue
+            end = bisect_left(signatures, prefix[:-1] + chr(ord(letter) + 1), lo, hi)
+            if counts[letter] > 0:
+                counts[letter] -= 1
+                yield from self._search(lo, end, depth + 1, counts, blanks, min_length)
+                counts[letter] += 1
+            else:
+                yield from self._search(lo, end, depth + 1, counts, blanks - 1, min_length)
+            lo = end
+
+
+def _parse_query(letters: str):
+    letters = letters.lower()
+    blanks = sum(1 for l in letters if l in BLANKS)
+    return "".join(l for l in letters if l.isalpha()), blanks
+
+
+def _get_index_filepath(cache_dir: Path, language: Language) -> Path:
+    return cache_dir.joinpath(f"signatures_{language.value}.bin")
+
+
+def _is_index_stale(filepath: Path, lexicon_filepath: Path) -> bool:
+    if not filepath.exists() or filepath.stat().st_mtime_ns < lexicon_filepath.stat().st_mtime_ns:
+        return True
+    with open(filepath, "rb") as fh:
+        header = fh.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return True
+    magic, version, _, _ = _HEADER.unpack(header)
+    return magic != _MAGIC or version != _FORMAT_VERSION
+
+
+def open_signature_index(all_words: WordsCache, language: Language) -> SignatureIndex:
+    """
+    Index over all words of the language kept next to words cache,
+    rebuilt whenever compiled lexicon is newer than it
+    """
+    filepath = _get_index_filepath(all_words.cache_dir, language)
+    if _is_index_stale(filepath, all_words.lexicon_filepath(language)):
+        print(f"Building {language.value} signature index...")
+        SignatureIndex.from_words(all_words[language].words()).save(filepath)
+    return SignatureIndex.load(filepath)
+
+
+def find_words_from_letters(index: SignatureIndex, letters: str, min_length: int = 3) -> str:
+    """
+    Finds words which can be made of given letters (not necessarily all of them),
+    "?" or "*" stands for a blank tile which can be any letter.
+    Longest words go first, so anagrams using all letters are on top. Example:
+    апельсин?
+    ---
+    спаниель
+    апельсин
+    ...
+    пенсия
+    """
+    return "\n".join(index.sub_anagrams(letters, min_length))
+
+
+def find_exact_anagrams(index: SignatureIndex, letters: str) -> str:
+    """
+    Finds words made of exactly given letters, "?" or "*" stands for
+    a blank tile which can be any letter. Example:
+    кот
+    ---
+    кот
+    ток
+    кто
+    """
+    return "\n".join(index.anagrams(letters))
@@ -1,8 +1,10 @@
 import argparse
 import os
 from pathlib import Path
+from typing import Iterable
 
-from utils.words_cache import is_cache_ready, build_cache, load_caches
+from utils.language import Language
+from utils.words_cache import WordsCache
 
 
 def prepare_argsparse():
@@ -14,14 +16,22 @@ def prepare_argsparse():
         help="""Expecting to find nouns.txt, verbs.txt, adjectives.txt in this directory. 
              If not specified, will create 'cache' directory in current directory,
              then download and preprocess vocabulary here. 
-             .txt are not rewritten after that, you can manipulate cache as you see fit.""",
+             .txt are rewritten only when source archive, --cache_count or preprocessing
+             changes, otherwise you can manipulate cache as you see fit.""",
         default=Path(os.getcwd()).joinpath("cache"))
     group.add_argument(
         "--cache_count",
         metavar="COUNT",
         type=int,
-        help="""When rebuilding cache use this amount of most popular words""",
+        help="""Use this amount of most popular words, cache is rebuilt when it changes""",
         default=100000)
+    group.add_argument(
+        "--corpus_mirror",
+        metavar="URL_OR_PATH",
+        help="""When rebuilding cache download corpus archives from this base URL
+             or copy them from this local directory instead of original sites.
+             Archives are looked up by their original file names""",
+        default=None)
     group.add_argument(
         "--result_dir",
         metavar="PATH",
@@ -45,11 +55,11 @@ def prepare_result_dir(args):
     return result_dir
 
 
-def prepare_data(args):
+def prepare_data(args, languages: Iterable[Language] = (Language.RUSSIAN, Language.ENGLISH)) -> WordsCache:
+    """
+    Words cache for languages the run needs, all of them are downloaded
+    and built together if the cache is missing
+    """
     cache_dir = Path(args["cache_dir"])
     _ensure_dir_exists(cache_dir)
-    if not is_cache_ready(cache_dir):
-        print("Words cache is not ready, rebuilding...")
-        build_cache(cache_dir, args["cache_count"])
-    all_words = load_caches(cache_dir)
-    return all_words
+    return WordsCache(cache_dir, args["cache_count"], args["corpus_mirror"], languages)
@@ -0,0 +1 @@
+# Keeps top-level packages (utils, words_condition, ...) importable from tests/
@@ -3,27 +3,35 @@
 from common_args_parse import prepare_argsparse, prepare_result_dir, prepare_data
 from stenography.in_words_overlap import hide_in_words_overlap
 from stenography.spiral_hide import spiral_hide
-from stenography.diagnoal_fill_to_square import diagonal_fill_to_square_last, diagonal_fill_to_square_first
+from stenography.diagnoal_fill_to_square import diagonal_fill_to_square_last, diagonal_fill_to_square_first, \
+    diagonal_fill
 from stenography.hide_image_in_words import hide_image
 from stenography.in_between_words import hide_in_between_words
 from stenography.letters_before_sequence import hide_letters_before_sequence
 from stenography.nth_letter import hide_in_nth_letters
-from utils.language import Language
+from utils.language import Language, get_known_parts_of_speech
 
 
 # Right now there is only stenography, but I intend to add cyphers
 # which are better combined with stenography
 
 
+NOUNS = ("nouns",)
+ALL_POS = tuple(get_known_parts_of_speech())
+
+
+# Every algorithm declares parts of speech it reads,
+# only those are loaded from (russian) words cache
 registered_stenography_input = {
-    "letters_before_sequence": (hide_letters_before_sequence, "SECRET_WORD,MARKING_SEQUENCE"),
-    "nth_letter": (hide_in_nth_letters, "SECRET_WORD,N"),
-    "between_words": (hide_in_between_words, "SECRET_WORD,MAXCOUNT"),
-    "words_overlap": (hide_in_words_overlap, "SECRET_WORD,COUNT"),
-    "hide_image": (hide_image, "IMAGE_LINE;IMAGE_LINE;IMAGE_LINE,..."),
-    "diagonal_fill_last": (diagonal_fill_to_square_last, "SECRET_WORD"),
-    "diagonal_fill_first": (diagonal_fill_to_square_first, "SECRET_WORD"),
-    "spiral_hide": (spiral_hide, "SECRET_WORD"),
+    "letters_before_sequence": (hide_letters_before_sequence, "SECRET_WORD,MARKING_SEQUENCE", ALL_POS),
+    "nth_letter": (hide_in_nth_letters, "SECRET_WORD,N", ALL_POS),
+    "between_words": (hide_in_between_words, "SECRET_WORD,MAXCOUNT[,MAX_PHRASE_WORDS]", ALL_POS),
+    "words_overlap": (hide_in_words_overlap, "SECRET_WORD,COUNT[,SEED]", NOUNS),
+    "hide_image": (hide_image, "IMAGE_LINE;IMAGE_LINE;...[,MAX_DISTANCE]", NOUNS),
+    "diagonal_fill_last": (diagonal_fill_to_square_last, "SECRET_WORD", NOUNS),
+    "diagonal_fill_first": (diagonal_fill_to_square_first, "SECRET_WORD", NOUNS),
+    "diagonal_fill": (diagonal_fill, "SECRET_WORD[,LAYOUT,COUNT,SEED]", NOUNS),
+    "spiral_hide": (spiral_hide, "SECRET_WORD", ()),
 }
 
 
@@ -36,7 +44,7 @@ def parse_args():
         help=f"""
         Redirects output to terminal instead of file in result_dir""",
         action="store_true", default=False)
-    for key, (fn, metavar_hint) in registered_stenography_input.items():
+    for key, (fn, metavar_hint, _) in registered_stenography_input.items():
         group.add_argument(f"--{key}", help=fn.__doc__, metavar=metavar_hint, default="")
     return parser.parse_args()
 
@@ -44,13 +52,13 @@ def parse_args():
 def main():
     args = vars(parse_args())
     result_dir = prepare_result_dir(args)
-    all_words = prepare_data(args)
+    all_words = prepare_data(args, [Language.RUSSIAN])
 
-    for algo_name, (fn, _) in registered_stenography_input.items():
+    for algo_name, (fn, _, parts_of_speech) in registered_stenography_input.items():
         if args[algo_name]:
             print(f"Processing '{algo_name}'...")
             stenography_args = args[algo_name].split(",")
-            result = fn(all_words[Language.RUSSIAN], *stenography_args)
+            result = fn(all_words.load(Language.RUSSIAN, parts_of_speech), *stenography_args)
             if args["terminal"]:
                 print(result)
             else:
@@ -1,36 +1,47 @@
 #!/usr/bin/env python3
 
 from anagrams.find_anagrams import find_anagrams
+from mathy.matchsticks import matchstick_puzzles
 from mathy.strange_math import lettery_math_table, roman_dashes_math_table
 from patterns.most_complicated_phone_locks import find_most_complicated_phone_locks
 from common_args_parse import prepare_argsparse, prepare_result_dir, prepare_data
 from utils.output_formatting import write_ioi, write_doi, write_i
 from words_condition.prefixes_suffixes import find_words_with_common_word_prefix, find_words_with_common_prefix, \
     find_words_with_common_suffix, find_words_with_common_word_suffix
-from utils.language import Language, UnsupportedLanguageForAlgorithm
-from words_condition.roman_numerals import find_roman_numeral_removable
+from utils.language import Language, UnsupportedLanguageForAlgorithm, get_known_parts_of_speech
+from words_condition.roman_numerals import find_roman_numeral_removable, find_letter_removal_ladders
 from words_condition.sandwichable_words import find_double_sandwichable_words, find_sandwichable_words_multistuffing
-from words_condition.spinning_words import find_spinning_words
+from words_condition.spinning_words import find_spinning_words, find_semordnilaps, find_anagram_families
 from words_condition.word_chains import find_word_chains
 from words_condition.word_squares import find_magic_word_squares
 
 
+NOUNS = ("nouns",)
+ALL_POS = tuple(get_known_parts_of_speech())
+
+
+# Every task declares languages it supports and parts of speech it reads,
+# only those are loaded from words cache
 registered_tasks_noinput = {
-    "common_word_prefix": (find_words_with_common_word_prefix, write_ioi, (Language.RUSSIAN, Language.ENGLISH)),
-    "common_prefix": (find_words_with_common_prefix, write_ioi, (Language.RUSSIAN, Language.ENGLISH)),
-    "common_word_suffix": (find_words_with_common_word_suffix, write_ioi, (Language.RUSSIAN, Language.ENGLISH)),
-    "common_suffix": (find_words_with_common_suffix, write_ioi, (Language.RUSSIAN, Language.ENGLISH)),
-    "double_sandwichable": (find_double_sandwichable_words, write_doi, (Language.RUSSIAN, Language.ENGLISH)),
-    "sandwichable_multistuffing": (find_sandwichable_words_multistuffing, write_doi, (Language.RUSSIAN, Language.ENGLISH)),
-    "spinning": (find_spinning_words, write_ioi, (Language.RUSSIAN, Language.ENGLISH)),
-    "chains": (find_word_chains, write_ioi, (Language.RUSSIAN, Language.ENGLISH)),
-    "squares": (find_magic_word_squares, write_ioi, (Language.RUSSIAN, Language.ENGLISH)),
-    "roman_removable": (find_roman_numeral_removable, write_ioi, (Language.ENGLISH,)),
+    "common_word_prefix": (find_words_with_common_word_prefix, write_ioi, (Language.RUSSIAN, Language.ENGLISH), ALL_POS),
+    "common_prefix": (find_words_with_common_prefix, write_ioi, (Language.RUSSIAN, Language.ENGLISH), NOUNS),
+    "common_word_suffix": (find_words_with_common_word_suffix, write_ioi, (Language.RUSSIAN, Language.ENGLISH), ALL_POS),
+    "common_suffix": (find_words_with_common_suffix, write_ioi, (Language.RUSSIAN, Language.ENGLISH), NOUNS),
+    "double_sandwichable": (find_double_sandwichable_words, write_doi, (Language.RUSSIAN, Language.ENGLISH), NOUNS),
+    "sandwichable_multistuffing": (find_sandwichable_words_multistuffing, write_doi, (Language.RUSSIAN, Language.ENGLISH), ALL_POS),
+    "spinning": (find_spinning_words, write_ioi, (Language.RUSSIAN, Language.ENGLISH), NOUNS),
+    "semordnilaps": (find_semordnilaps, write_ioi, (Language.RUSSIAN, Language.ENGLISH), ALL_POS),
+    "anagram_families": (find_anagram_families, write_ioi, (Language.RUSSIAN, Language.ENGLISH), ALL_POS),
+    "chains": (find_word_chains, write_ioi, (Language.RUSSIAN, Language.ENGLISH), NOUNS),
+    "squares": (find_magic_word_squares, write_ioi, (Language.RUSSIAN, Language.ENGLISH), NOUNS),
+    "roman_removable": (find_roman_numeral_removable, write_ioi, (Language.ENGLISH,), ALL_POS),
+    "letter_ladders": (find_letter_removal_ladders, write_ioi, (Language.RUSSIAN, Language.ENGLISH), ALL_POS),
 
-    "phone_locks": (find_most_complicated_phone_locks, write_i, (Language.NONE,)),
+    "phone_locks": (find_most_complicated_phone_locks, write_i, (Language.NONE,), ()),
 
-    "lettery_math": (lettery_math_table, write_i, (Language.NONE,)),
-    "roman_dashes_math": (roman_dashes_math_table, write_i, (Language.NONE,))
+    "lettery_math": (lettery_math_table, write_i, (Language.NONE,), ()),
+    "roman_dashes_math": (roman_dashes_math_table, write_i, (Language.NONE,), ()),
+    "matchstick_puzzles": (matchstick_puzzles, write_i, (Language.NONE,), ())
 }
 
 
@@ -39,7 +50,7 @@ def parse_args():
     group = parser.add_argument_group(
         "Noinput"
         "Search words or patterns abiding certain rule")
-    for key, (fn, _, _) in registered_tasks_noinput.items():
+    for key, (fn, _, _, _) in registered_tasks_noinput.items():
         group.add_argument(f"--{key}", help=fn.__doc__, action="store_true", default=False)
     group.add_argument(
         "--language",
@@ -51,6 +62,15 @@ def parse_args():
         nargs='?',
         choices=[lang.value for lang in Language],
     )
+    group.add_argument(
+        "--top_k",
+        metavar="K",
+        type=int,
+        help=f"""
+        Keeps only K results consisting of the most common words for every
+        words search (search stops early where it is possible). Keeps
+        everything if not specified""",
+        default=None)
     group.add_argument(
         "--all_noinput",
         help=f"""
@@ -64,16 +84,20 @@ def parse_args():
 def main():
     args = vars(parse_args())
     result_dir = prepare_result_dir(args)
-    all_words = prepare_data(args)
-
     selected_language = Language.from_str(args["language"])
     if args["all_noinput"]:
         for algo_name in registered_tasks_noinput.keys():
             args[algo_name] = True
+    # words of every language selected tasks need are prepared together
+    needed_languages = {lang for algo_name, (_, _, supported_languages, _) in registered_tasks_noinput.items()
+                        if args[algo_name] for lang in supported_languages
+                        if lang is not Language.NONE and selected_language in (Language.ALL, lang)}
+    all_words = prepare_data(args, [lang for lang in (Language.RUSSIAN, Language.ENGLISH) if lang in needed_languages])
 
-    for algo_name, (fn, writer_fn, supported_languages) in registered_tasks_noinput.items():
+    for algo_name, (fn, writer_fn, supported_languages, parts_of_speech) in registered_tasks_noinput.items():
         def process_algo_for_language(lang):
-            result = fn() if lang is Language.NONE else fn(all_words[lang])
+            result = fn() if lang is Language.NONE \
+                else fn(all_words.load(lang, parts_of_speech), top_k=args["top_k"])
             writer_fn(result_dir, f"{algo_name}_{lang.value}", result)
         if args[algo_name]:
             print(f"Processing {algo_name!r}...")
@@ -1,7 +1,13 @@
-from anagrams.find_anagrams import find_anagrams
+from pathlib import Path
+
+from anagrams.find_anagrams import find_anagrams, iterate_anagrams
+from anagrams.signature_index import open_signature_index, find_words_from_letters, find_exact_anagrams
 from common_args_parse import prepare_argsparse, prepare_result_dir, prepare_data
 from ideation.random_sampling import sample_words
-from utils.language import Language
+from mathy.matchsticks import find_matchstick_solutions
+from mathy.strange_math import lettery_equations
+from patterns.unlock_patterns import find_unlock_patterns
+from utils.language import Language, get_known_parts_of_speech
 
 
 def parse_args():
@@ -9,6 +15,20 @@ def parse_args():
     group = parser.add_argument_group("Other")
     group.add_argument(
         "--anagrams", help=find_anagrams.__doc__, metavar="WORD", default="")
+    group.add_argument(
+        "--workers", help="Processes to search anagrams with. With more than one "
+                          "anagrams are printed as soon as found, not sorted",
+        metavar="N", type=int, default=1)
+    group.add_argument(
+        "--letters", help=find_words_from_letters.__doc__, metavar="LETTERS", default="")
+    group.add_argument(
+        "--exact_letters", help=find_exact_anagrams.__doc__, metavar="LETTERS", default="")
+    group.add_argument(
+        "--unlock_patterns", help=find_unlock_patterns.__doc__, metavar="CONDITIONS", default=None)
+    group.add_argument(
+        "--lettery_equations", help=lettery_equations.__doc__, metavar="N", type=int, default=None)
+    group.add_argument(
+        "--matchsticks", help=find_matchstick_solutions.__doc__, metavar="EQUATION", default="")
     group.add_argument(
         "--sample", help=sample_words.__doc__, metavar="N", type=int, default=0)
     return parser.parse_args()
@@ -17,13 +37,27 @@ def parse_args():
 def main():
     args = vars(parse_args())
     result_dir = prepare_result_dir(args)
-    all_words = prepare_data(args)
+    all_words = prepare_data(args, [Language.RUSSIAN])
 
     if args["anagrams"]:
-        result = find_anagrams(all_words[Language.RUSSIAN], args["anagrams"])
-        print(result)
+        for parts in iterate_anagrams(all_words.load(Language.RUSSIAN, ["nouns"]), args["anagrams"], args["workers"]):
+            print(",".join(parts), flush=True)
+    if args["letters"]:
+        print(find_words_from_letters(open_signature_index(all_words, Language.RUSSIAN), args["letters"]))
+    if args["exact_letters"]:
+        print(find_exact_anagrams(open_signature_index(all_words, Language.RUSSIAN), args["exact_letters"]))
+    if args["unlock_patterns"] is not None:
+        for pattern in find_unlock_patterns(Path(args["cache_dir"]).joinpath("unlock_patterns.bin"),
+                                            args["unlock_patterns"]):
+            print(pattern)
+    if args["lettery_equations"] is not None:
+        for line in lettery_equations(args["lettery_equations"]):
+            print(line)
+    if args["matchsticks"]:
+        for line in find_matchstick_solutions(args["matchsticks"]):
+            print(line)
     if args["sample"]:
-        result = sample_words(all_words[Language.RUSSIAN], args["sample"])
+        result = sample_words(all_words.load(Language.RUSSIAN, get_known_parts_of_speech()), args["sample"])
         for word in result:
             print(word)
 
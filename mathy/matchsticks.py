@@ -0,0 +1,269 @@
+from functools import lru_cache
+from itertools import product
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from tqdm import tqdm
+
+__all__ = ["GLYPH_STICKS", "to_roman", "stick_count", "solve_matchsticks", "generate_matchstick_puzzles",
+           "find_matchstick_solutions", "matchstick_puzzles"]
+
+
+# Every glyph is a set of stick slots of a cell, so turning one glyph into
+# another is removing sticks it doesn't share with the new one and adding
+# the missing ones. Slots:
+#   c - center vertical, l, r - left and right verticals,
+#   dd, du - full diagonals, vl, vr - halves of V meeting at the bottom,
+#   ml, mr - inner strokes of M, b - bottom horizontal,
+#   h, h2 - middle horizontal and one more under it, sd, su - small diagonals
+# Multiplication sign is drawn smaller than X, so they are different glyphs.
+GLYPH_STICKS: Dict[str, FrozenSet[str]] = {
+    "": frozenset(),
+    "I": frozenset({"c"}),
+    "V": frozenset({"vl", "vr"}),
+    "X": frozenset({"dd", "du"}),
+    "L": frozenset({"l", "b"}),
+    "M": frozenset({"l", "ml", "mr", "r"}),
+    "+": frozenset({"h", "c"}),
+    "-": frozenset({"h"}),
+    "x": frozenset({"sd", "su"}),
+    "=": frozenset({"h", "h2"}),
+}
+
+_OPERATORS = "+-x"
+_ROMAN_VALUES = [(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"), (100, "C"), (90, "XC"),
+                 (50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+
+
+def to_roman(n: int) -> Optional[str]:
+    """
+    Roman numeral for number, None if it can't be made of sticks (needs C or D)
+    """
+    if not 0 < n < 4000:
+        return None
+    result = ""
+    for value, numeral in _ROMAN_VALUES:
+        while n >= value:
+            result += numeral
+            n -= value
+    return None if any(letter not in GLYPH_STICKS for letter in result) else result
+
+
+_NUMERALS: Dict[str, int] = {numeral: n for n, numeral in ((n, to_roman(n)) for n in range(1, 4000)) if numeral}
+_ROMAN_BY_VALUE: Dict[int, str] = {n: numeral for numeral, n in _NUMERALS.items()}
+_NUMERAL_PREFIXES = {numeral[:i] for numeral in _NUMERALS for i in range(len(numeral) + 1)}
+
+
+@lru_cache(maxsize=None)
+def stick_count(text: str) -> int:
+    return sum(len(GLYPH_STICKS[glyph]) for glyph in text if glyph != " ")
+
+
+@lru_cache(maxsize=None)
+def _glyph_diff(source: str, target: str) -> Tuple[int, int]:
+    """
+    (sticks removed, sticks added) to turn one glyph into another
+    """
+    source_sticks, target_sticks = GLYPH_STICKS[source], GLYPH_STICKS[target]
+    return len(source_sticks - target_sticks), len(target_sticks - source_sticks)
+
+
+# Equation "numeral (op numeral)* = numeral" is read glyph by glyph keeping state
+#   (right side started, sum of finished terms, sign of current term,
+#    product of finished factors of current term, current numeral, left side value),
+# so prefixes which can't become well-formed equation are cut off at once.
+# If only true equations are wanted, right side is known as soon as "=" is read.
+_State = Tuple[bool, int, int, int, str, int]
+_START: _State = (False, 0, 1, 1, "", 0)
+
+
+def _feed(state: _State, glyph: str, want_true: bool) -> Optional[_State]:
+    right, total, sign, factors, numeral, left_value = state
+    if glyph in _OPERATORS or glyph == "=":
+        value = _NUMERALS.get(numeral)
+        if right or value is None:
+            return None
+        if glyph == "x":
+            return False, total, sign, factors * value, "", 0
+        total += sign * factors * value
+        if glyph == "=":
+            if want_true and total not in _ROMAN_BY_VALUE:
+                return None
+            return True, 0, 1, 1, "", total
+        return False, total, 1 if glyph == "+" else -1, 1, "", 0
+    numeral += glyph
+    if right and want_true:
+        if not _ROMAN_BY_VALUE[left_value].startswith(numeral):
+            return None
+    elif numeral not in _NUMERAL_PREFIXES:
+        return None
+    return right, total, sign, factors, numeral, left_value
+
+
+def _is_final(state: _State, want_true: bool) -> bool:
+    right, _, _, _, numeral, left_value = state
+    if not right or numeral not in _NUMERALS:
+        return False
+    return (_NUMERALS[numeral] == left_value) == want_true
+
+
+def _cells(equation: str) -> List[str]:
+    # empty cell around every glyph, so sticks can form new glyphs there
+    cells = [""]
+    for glyph in equation.replace(" ", ""):
+        if glyph not in GLYPH_STICKS:
+            raise ValueError(f"Glyph {glyph!r} can't be made of sticks, known glyphs are: " +
+                             " ".join(g for g in GLYPH_STICKS if g))
+        cells += [glyph, ""]
+    return cells
+
+
+def _budget(sticks: int, mode: str) -> Tuple[int, int]:
+    if mode == "move":
+        return sticks, sticks
+    if mode == "add":
+        return 0, sticks
+    if mode == "remove":
+        return sticks, 0
+    raise ValueError(f"Unknown mode {mode!r}, expected move, add or remove")
+
+
+class _StickSearch:
+    """
+    Depth-first search over glyphs of cells spending exactly the stick budget.
+    Cell suffixes are interned, and sets of suffixes reachable from
+    (cells suffix, sticks removed, sticks added, parser state) are memoized
+    across searches: equations searched one after another (e.g. puzzles made
+    of the same equation) mostly differ in a few cells and share the rest.
+    """
+    def __init__(self, sticks: int, mode: str, want_true: bool, memo_limit: int = 2_000_000):
+        self.max_removed, self.max_added = _budget(sticks, mode)
+        self.want_true = want_true
+        self.memo_limit = memo_limit
+        # (glyph, sticks removed, sticks added) every glyph can turn into within budget
+        self.options = {
+            cell: [(glyph,) + _glyph_diff(cell, glyph) for glyph in GLYPH_STICKS
+                   if _glyph_diff(cell, glyph)[0] <= self.max_removed and _glyph_diff(cell, glyph)[1] <= self.max_added]
+            for cell in GLYPH_STICKS}
+        # suffix id -> (first glyph, id of the rest, sticks in suffix, glyphs in suffix)
+        self.suffixes: List[Tuple[str, int, int, int]] = [("", 0, 0, 0)]
+        self.suffix_ids: Dict[Tuple[str, int], int] = {}
+        self.memo: Dict[Tuple[int, int, int, _State], List[str]] = {}
+
+    def _intern(self, cells: List[str]) -> int:
+        suffix_id = 0
+        for cell in reversed(cells):
+            key = (cell, suffix_id)
+            if key not in self.suffix_ids:
+                _, _, sticks, length = self.suffixes[suffix_id]
+                self.suffix_ids[key] = len(self.suffixes)
+                self.suffixes.append((cell, suffix_id, sticks + len(GLYPH_STICKS[cell]), length + 1))
+            suffix_id = self.suffix_ids[key]
+        return suffix_id
+
+    def search(self, cells: List[str]) -> List[str]:
+        if len(self.memo) > self.memo_limit:
+            self.memo.clear()
+        return self._walk(self._intern(cells), 0, 0, _START)
+
+    def _walk(self, suffix_id: int, removed: int, added: int, state: _State) -> List[str]:
+        max_removed, max_added = self.max_removed, self.max_added
+        cell, rest_id, sticks, length = self.suffixes[suffix_id]
+        if not suffix_id:
+            return [""] if removed == max_removed and added == max_added and _is_final(state, self.want_true) else []
+        if self.want_true and state[0]:
+            # the rest of the right side is known, remaining cells have to be
+            # turned into it, which takes at least the difference of their sticks
+            rest = _ROMAN_BY_VALUE[state[-1]][len(state[-2]):]
+            if len(rest) > length:
+                return []
+            difference = stick_count(rest) - sticks
+            if added + max(difference, 0) > max_added or removed + max(-difference, 0) > max_removed:
+                return []
+        key = (suffix_id, removed, added, state)
+        if key in self.memo:
+            return self.memo[key]
+        rest_sticks = self.suffixes[rest_id][2]
+        found = []
+        for glyph, glyph_removed, glyph_added in self.options[cell]:
+            new_removed, new_added = removed + glyph_removed, added + glyph_added
+            if new_removed > max_removed or new_added > max_added or new_removed + rest_sticks < max_removed:
+                continue
+            new_state = _feed(state, glyph, self.want_true) if glyph else state
+            if new_state is not None:
+                found += [glyph + suffix for suffix in self._walk(rest_id, new_removed, new_added, new_state)]
+        self.memo[key] = found
+        return found
+
+
+def _format(text: str) -> str:
+    return "".join(f" {glyph} " if glyph in _OPERATORS or glyph == "=" else glyph for glyph in text)
+
+
+def solve_matchsticks(equation: str, sticks: int = 1, mode: str = "move") -> List[str]:
+    """
+    All true equations made of given one by moving (adding, removing)
+    exactly `sticks` sticks
+    """
+    return sorted({_format(text) for text in _StickSearch(sticks, mode, True).search(_cells(equation))})
+
+
+def generate_matchstick_puzzles(max_number: int = 20,
+                                sticks: int = 1,
+                                mode: str = "move",
+                                unique: bool = True) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (puzzle, solution) pairs: false equations which are fixed by
+    moving (adding, removing) `sticks` sticks, every one verified by solver.
+    Puzzles are made of true equations "A op B = C" with A and B up to max_number.
+    """
+    reverse_search = _StickSearch(sticks, {"move": "move", "add": "remove", "remove": "add"}[mode], False)
+    solver = _StickSearch(sticks, mode, True)
+    numerals = [numeral for numeral in map(to_roman, range(1, max_number + 1)) if numeral]
+    seen = set()
+    equations = list(product(numerals, _OPERATORS, numerals))
+    for a, operator, b in tqdm(equations, total=len(equations), desc="Equations"):
+        state = _START
+        for glyph in a + operator + b + "=":
+            state = _feed(state, glyph, True)
+            if state is None:
+                break
+        if state is None:
+            continue
+        solution = a + operator + b + "=" + _ROMAN_BY_VALUE[state[-1]]
+        for puzzle in reverse_search.search(_cells(solution)):
+            if puzzle in seen:
+                continue
+            seen.add(puzzle)
+            solutions = set(solver.search(_cells(puzzle)))
+            if solution in solutions and (not unique or len(solutions) == 1):
+                yield _format(puzzle), _format(solution)
+
+
+def find_matchstick_solutions(equation: str) -> List[str]:
+    """
+    Finds how to fix equation made of sticks (Roman numerals I, V, X, L, M
+    and + - x =) by moving, adding or removing one or two sticks. Example:
+    XI + I = X
+    ---
+    move 1: IX + I = X
+    move 1: X + I = XI
+    ...
+    """
+    result, seen = [], set()
+    for sticks, mode in product([1, 2], ["move", "add", "remove"]):
+        # equations fixed with fewer sticks are not repeated
+        solutions = [solution for solution in solve_matchsticks(equation, sticks, mode) if solution not in seen]
+        seen.update(solutions)
+        result += [f"{mode} {sticks}: {solution}" for solution in solutions]
+    return result
+
+
+def matchstick_puzzles() -> List[str]:
+    """
+    Generates equations made of sticks (Roman numerals and operators) which
+    become true after moving exactly one stick, each has the only solution.
+    Example:
+    I + II = I  ->  I + I = II
+    ...
+    """
+    return [f"{puzzle}  ->  {solution}" for puzzle, solution in generate_matchstick_puzzles(20, 1, "move")]
@@ -0,0 +1,162 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.language import Language, UnsupportedLanguageForAlgorithm
+
+__all__ = ["number_to_words", "letters_count", "letter_lengths", "find_lettery_equations", "OPERATIONS"]
+
+
+_RU_UNITS = ["", "один", "два", "три", "четыре", "пять", "шесть", "семь", "восемь", "девять"]
+_RU_UNITS_FEMININE = ["", "одна", "две"] + _RU_UNITS[3:]
+_RU_TEENS = ["десять", "одиннадцать", "двенадцать", "тринадцать", "четырнадцать",
+             "пятнадцать", "шестнадцать", "семнадцать", "восемнадцать", "девятнадцать"]
+_RU_TENS = ["", "", "двадцать", "тридцать", "сорок", "пятьдесят",
+            "шестьдесят", "семьдесят", "восемьдесят", "девяносто"]
+_RU_HUNDREDS = ["", "сто", "двести", "триста", "четыреста", "пятьсот",
+                "шестьсот", "семьсот", "восемьсот", "девятьсот"]
+# (one, few, many) forms and whether scale word is feminine
+_RU_SCALES = [
+    (("", "", ""), False),
+    (("тысяча", "тысячи", "тысяч"), True),
+    (("миллион", "миллиона", "миллионов"), False),
+    (("миллиард", "миллиарда", "миллиардов"), False),
+]
+
+_EN_UNITS = ["", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+             "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen",
+             "sixteen", "seventeen", "eighteen", "nineteen"]
+_EN_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+_EN_SCALES = ["", "thousand", "million", "billion"]
+
+# Operation sign and how it is read
+OPERATIONS: Dict[Language, List[Tuple[str, str]]] = {
+    Language.RUSSIAN: [("+", "плюс"), ("-", "минус"), ("x", "умножить на")],
+    Language.ENGLISH: [("+", "plus"), ("-", "minus"), ("x", "times")],
+}
+
+
+def _ru_plural(n: int, forms: Tuple[str, str, str]) -> str:
+    if 11 <= n % 100 <= 19:
+        return forms[2]
+    if n % 10 == 1:
+        return forms[0]
+    if 2 <= n % 10 <= 4:
+        return forms[1]
+    return forms[2]
+
+
+def _ru_below_thousand(n: int, feminine: bool) -> List[str]:
+    words = [_RU_HUNDREDS[n // 100]]
+    n %= 100
+    if 10 <= n <= 19:
+        words.append(_RU_TEENS[n - 10])
+    else:
+        words.append(_RU_TENS[n // 10])
+        words.append((_RU_UNITS_FEMININE if feminine else _RU_UNITS)[n % 10])
+    return [word for word in words if word]
+
+
+def _en_below_thousand(n: int) -> List[str]:
+    words = []
+    if n >= 100:
+        words += [_EN_UNITS[n // 100], "hundred"]
+        n %= 100
+    if n >= 20:
+        words.append(_EN_TENS[n // 10] + ("-" + _EN_UNITS[n % 10] if n % 10 else ""))
+    elif n:
+        words.append(_EN_UNITS[n])
+    return words
+
+
+def _chunks(n: int, scales_count: int) -> List[Tuple[int, int]]:
+    chunks = []
+    for scale in range(scales_count):
+        if n % 1000:
+            chunks.append((scale, n % 1000))
+        n //= 1000
+    if n:
+        raise ValueError("Number is too large to be spelled")
+    return chunks[::-1]
+
+
+def number_to_words(n: int, language: Language) -> str:
+    """
+    Spells non-negative integer below 10^12, e.g. 2021 is
+    "две тысячи двадцать один" or "two thousand twenty-one"
+    """
+    if n < 0:
+        raise ValueError("Only non-negative numbers can be spelled")
+    if language is Language.RUSSIAN:
+        if n == 0:
+            return "ноль"
+        words = []
+        for scale, chunk in _chunks(n, len(_RU_SCALES)):
+            forms, feminine = _RU_SCALES[scale]
+            # "тысяча", not "одна тысяча", but "миллион одна тысяча"
+            if scale and chunk == 1 and not words:
+                words.append(forms[0])
+                continue
+            words += _ru_below_thousand(chunk, feminine)
+            if scale:
+                words.append(_ru_plural(chunk, forms))
+        return " ".join(words)
+    if language is Language.ENGLISH:
+        if n == 0:
+            return "zero"
+        words = []
+        for scale, chunk in _chunks(n, len(_EN_SCALES)):
+            words += _en_below_thousand(chunk)
+            if scale:
+                words.append(_EN_SCALES[scale])
+        return " ".join(words)
+    raise UnsupportedLanguageForAlgorithm("number_to_words", language, [Language.RUSSIAN, Language.ENGLISH])
+
+
+def letters_count(text: str) -> int:
+    return sum(1 for letter in text if letter.isalpha())
+
+
+def letter_lengths(numbers: Sequence[int], language: Language) -> np.ndarray:
+    """
+    Letters in spelled form of every number
+    """
+    return np.fromiter((letters_count(number_to_words(n, language)) for n in numbers),
+                       dtype=np.int64, count=len(numbers))
+
+
+def find_lettery_equations(
+        xs: range,
+        ys: range,
+        language: Language,
+        operations: Optional[List[Tuple[str, str]]] = None,
+        target: Optional[int] = None,
+        rows_per_chunk: int = 256) -> Iterator[Tuple[int, str, int, int]]:
+    """
+    Yields (x, operation sign, y, letters) for equations "x op y" whose
+    spelled form has as many letters as their result (or as `target`).
+    Letter counts of whole equations and results are computed in bulk
+    for blocks of rows of x * y table, so nothing of its size is held.
+    """
+    operations = OPERATIONS[language] if operations is None else operations
+    x_values = np.arange(xs.start, xs.stop, xs.step, dtype=np.int64)
+    y_values = np.arange(ys.start, ys.stop, ys.step, dtype=np.int64)
+    x_lengths = letter_lengths(xs, language)
+    y_lengths = letter_lengths(ys, language)
+    for sign, spelled in operations:
+        operation_length = letters_count(spelled)
+        for start in range(0, len(x_values), rows_per_chunk):
+            x_block = x_values[start:start + rows_per_chunk, None]
+            lengths = x_lengths[start:start + rows_per_chunk, None] + operation_length + y_lengths[None, :]
+            if target is not None:
+                matches = lengths == target
+            elif sign == "+":
+                matches = lengths == x_block + y_values[None, :]
+            elif sign == "-":
+                matches = lengths == x_block - y_values[None, :]
+            elif sign == "x":
+                matches = lengths == x_block * y_values[None, :]
+            else:
+                raise ValueError(f"Unknown operation {sign!r}")
+            for row, col in zip(*np.nonzero(matches)):
+                yield int(x_block[row, 0]), sign, int(y_values[col]), int(lengths[row, col])
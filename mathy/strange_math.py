@@ -1,5 +1,9 @@
 from itertools import product
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+from mathy.matchsticks import stick_count, to_roman
+from mathy.number_words import number_to_words, find_lettery_equations
+from utils.language import Language
 
 
 def lettery_math_table_common(numbers: List[Tuple[int, str]],
@@ -14,29 +18,7 @@ def lettery_math_table_common(numbers: List[Tuple[int, str]],
 
 
 def lettery_math_table_ru() -> List[str]:
-    numbers = [
-        (0, "ноль"),
-        (1, "один"),
-        (2, "два"),
-        (3, "три"),
-        (4, "четыре"),
-        (5, "пять"),
-        (6, "шесть"),
-        (7, "семь"),
-        (8, "восемь"),
-        (9, "девять"),
-        (10, "десять"),
-        (11, "одиннадцать"),
-        (12, "двенадцать"),
-        (13, "тринадцать"),
-        (14, "четырнадцать"),
-        (15, "пятнадцать"),
-        (16, "шестнадцать"),
-        (17, "семнадцать"),
-        (18, "восемнадцать"),
-        (19, "девятнадцать"),
-        (20, "двадцать")
-    ]
+    numbers = [(n, number_to_words(n, Language.RUSSIAN)) for n in range(21)]
     operations = [
         ("+", "плюс"),
         ("-", "минус"),
@@ -45,21 +27,7 @@ def lettery_math_table_ru() -> List[str]:
 
 
 def lettery_math_table_en() -> List[str]:
-    numbers = [
-        (0, "zero"),
-        (1, "one"),
-        (2, "two"),
-        (3, "three"),
-        (4, "four"),
-        (5, "five"),
-        (6, "six"),
-        (7, "seven"),
-        (8, "eight"),
-        (9, "nine"),
-        (10, "ten"),
-        (11, "eleven"),
-        (12, "twelve")
-    ]
+    numbers = [(n, number_to_words(n, Language.ENGLISH)) for n in range(13)]
     # should there be add/subtract instead?
     operations = [
         ("+", "plus"),
@@ -77,29 +45,30 @@ def lettery_math_table() -> List[str]:
     return result
 
 
+def lettery_equations(max_number: int) -> Iterator[str]:
+    """
+    Finds equations on numbers from 0 to given one which are true when
+    result is replaced with number of letters in equation written in words.
+    Example:
+    RU
+    1 + 17 = 18  <-- "один плюс семнадцать" has 18 letters
+    ...
+    EN
+    0 + 15 = 15
+    ...
+    """
+    for language, title in [(Language.RUSSIAN, "RU"), (Language.ENGLISH, "EN")]:
+        yield title
+        numbers = range(max_number + 1)
+        for x, opsign, y, letters in find_lettery_equations(numbers, numbers, language):
+            yield str(x) + " " + opsign + " " + str(y) + " = " + str(letters)
+
+
 def roman_dashes_math_table() -> List[str]:
-    numbers = [
-        (1, 1),  # I
-        (2, 2),  # II
-        (3, 3),  # III
-        (4, 3),  # IV
-        (5, 2),  # V
-        (6, 3),  # VI
-        (7, 4),  # VII
-        (8, 5),  # VIII
-        (9, 3),  # XI
-        (10, 2),  # X
-        (11, 3),  # XI
-        (12, 4),  # XII
-        (50, 2),  # L
-        (1000, 4),  # M
-    ]
+    # sticks are counted by glyphs of mathy.matchsticks
+    numbers = [(n, stick_count(to_roman(n))) for n in list(range(1, 13)) + [50, 1000]]
     # should there be add/subtract instead?
-    operations = [
-        ("+", 2),
-        ("-", 1),
-        ("x", 2),
-    ]
+    operations = [(opsign, stick_count(opsign)) for opsign in ["+", "-", "x"]]
     result = []
     for opsign, opdashes in operations:
         for (x, xdashes), (y, ystrrepr) in product(numbers, numbers):
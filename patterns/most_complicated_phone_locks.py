@@ -1,12 +1,13 @@
-import itertools
+from typing import Callable, Dict, List, Sequence, Set, Tuple
 
 from tqdm import tqdm
-import copy
 
 
-__all__ = ["find_most_complicated_phone_locks"]
+__all__ = ["find_most_complicated_phone_locks", "find_move_set_patterns"]
 
 
+Move = Tuple[int, int]
+
 _legal_moves = [
     (1, 0),
     (0, 1),
@@ -20,13 +21,119 @@ _legal_moves = [
     (1, -2),
 ]
 
-
-def _index(col, row):
-    return col + 3 * row
+# Moves which pass over dots: if dot is already visited, line goes on to the next one
+_skipping_moves = {(1, 0), (0, 1), (1, 1), (1, -1)}
 
 
-def _is_outside_of_board(col, row):
-    return not (0 <= col <= 2 and 0 <= row <= 2)
+def _grid_symmetries(cols: int, rows: int) -> List[Tuple[Callable[[int, int], Move], Callable[[int, int], Move]]]:
+    """
+    Symmetries of cols x rows grid as (cell transformation, move transformation)
+    """
+    symmetries = [
+        (lambda c, r: (c, r), lambda dc, dr: (dc, dr)),
+        (lambda c, r: (cols - 1 - c, r), lambda dc, dr: (-dc, dr)),
+        (lambda c, r: (c, rows - 1 - r), lambda dc, dr: (dc, -dr)),
+        (lambda c, r: (cols - 1 - c, rows - 1 - r), lambda dc, dr: (-dc, -dr)),
+    ]
+    if cols == rows:
+        symmetries += [
+            (lambda c, r: (r, c), lambda dc, dr: (dr, dc)),
+            (lambda c, r: (cols - 1 - r, c), lambda dc, dr: (-dr, dc)),
+            (lambda c, r: (r, rows - 1 - c), lambda dc, dr: (dr, -dc)),
+            (lambda c, r: (cols - 1 - r, rows - 1 - c), lambda dc, dr: (-dr, -dc)),
+        ]
+    return symmetries
+
+
+def _signed(moves) -> Set[Move]:
+    return {(sign * dc, sign * dr) for dc, dr in moves for sign in (1, -1)}
+
+
+def find_move_set_patterns(cols: int = 3,
+                           rows: int = 3,
+                           moves: Sequence[Move] = tuple(_legal_moves),
+                           skipping_moves: Set[Move] = frozenset(_skipping_moves)) -> List[List[int]]:
+    """
+    Finds all paths over cols x rows grid of dots using every move (in either
+    direction) exactly once and never visiting dot twice. Moves from
+    `skipping_moves` pass over visited dots. Paths are lists of dot indices
+    (col + cols * row) ordered by start dot (column-major) and then by moves
+    taken in order of `moves`, positive direction first.
+    Only start dots not equivalent by grid symmetries preserving move set
+    are searched, the rest of paths are their images.
+    """
+    moves = list(moves)
+    cells = cols * rows
+    signed_skipping = _signed(skipping_moves)
+    directed = [(i, (sign * dc, sign * dr)) for i, (dc, dr) in enumerate(moves) for sign in (1, -1)]
+
+    symmetries = [(cell_fn, move_fn) for cell_fn, move_fn in _grid_symmetries(cols, rows)
+                  if _signed(move_fn(*m) for m in moves) == _signed(moves)
+                  and _signed(move_fn(*m) for m in skipping_moves) == signed_skipping]
+
+    # Transitions from every dot for every directed move: dots passed over
+    # (if visited) followed by landing dot
+    transitions: List[List[Tuple[int, List[int]]]] = [[] for _ in range(cells)]
+    for cell in range(cells):
+        col, row = cell % cols, cell // cols
+        for move_idx, (dc, dr) in directed:
+            line = []
+            c, r = col + dc, row + dr
+            while 0 <= c < cols and 0 <= r < rows:
+                line.append(c + cols * r)
+                if (dc, dr) not in signed_skipping:
+                    break
+                c, r = c + dc, r + dr
+            transitions[cell].append((move_idx, line))
+
+    all_moves_mask = (1 << len(moves)) - 1
+    found: List[List[int]] = []
+
+    def solve(path: List[int], visited: int, moves_left: int):
+        if not moves_left:
+            found.append(list(path))
+            return
+        for move_idx, line in transitions[path[-1]]:
+            if not moves_left >> move_idx & 1:
+                continue
+            for cell in line:
+                if not visited >> cell & 1:
+                    path.append(cell)
+                    solve(path, visited | 1 << cell, moves_left & ~(1 << move_idx))
+                    path.pop()
+                    break
+
+    # one start dot from every orbit of grid symmetries
+    canonical_starts = []
+    seen = set()
+    for cell in range(cells):
+        if cell in seen:
+            continue
+        canonical_starts.append(cell)
+        for cell_fn, _ in symmetries:
+            c, r = cell_fn(cell % cols, cell // cols)
+            seen.add(c + cols * r)
+    for start in tqdm(canonical_starts, total=len(canonical_starts)):
+        solve([start], 1 << start, all_moves_mask)
+
+    paths = set()
+    for path in found:
+        for cell_fn, _ in symmetries:
+            paths.add(tuple(c + cols * r for c, r in (cell_fn(cell % cols, cell // cols) for cell in path)))
+
+    # Order paths as plain depth-first search from every dot would find them
+    choice_by_move: Dict[Move, Tuple[int, int]] = {}
+    for order, (move_idx, (dc, dr)) in enumerate(directed):
+        steps = range(1, max(cols, rows)) if (dc, dr) in signed_skipping else [1]
+        for step in steps:
+            choice_by_move.setdefault((dc * step, dr * step), (move_idx, order % 2))
+
+    def search_order(path: Tuple[int, ...]):
+        start = path[0]
+        return (start % cols, start // cols), [
+            choice_by_move[(b % cols - a % cols, b // cols - a // cols)] for a, b in zip(path, path[1:])]
+
+    return [list(path) for path in sorted(paths, key=search_order)]
 
 
 def find_most_complicated_phone_locks():
@@ -38,39 +145,10 @@ def find_most_complicated_phone_locks():
     Exactly 296 solutions exist. This function returns order of points to
     be used to generate lock for each of them.
     """
-    solutions = []
-
-    def solve(board, col, row, step, moves_left):
-        if moves_left:
-            for i, origin_move in enumerate(moves_left):
-                for direction in [1, -1]:
-                    directed_move = tuple(direction * m for m in origin_move)
-                    new_col, new_row = col + directed_move[0], row + directed_move[1]
-                    if _is_outside_of_board(new_col, new_row):
-                        continue
-                    idx = _index(new_col, new_row)
-                    if board[idx] != 0 and origin_move in {(1, 0), (0, 1), (1, 1), (1, -1)}:
-                        # In this situation we can skip that dot!
-                        new_col, new_row = new_col + directed_move[0], new_row + directed_move[1]
-                        if _is_outside_of_board(new_col, new_row):
-                            continue
-                        idx = _index(new_col, new_row)
-                    if board[idx] == 0:
-                        board_copy = copy.deepcopy(board)
-                        board_copy[idx] = step
-                        solve(board_copy, new_col, new_row, step + 1, moves_left[:i] + moves_left[i + 1:])
-        else:
-            solutions.append(copy.deepcopy(board))  # recursion bottom
-
-    for c, r in tqdm(itertools.product(range(3), range(3)), total=9):
+    solutions_str = []
+    for path in find_move_set_patterns():
         board = [0] * 9
-        board[_index(c, r)] = 1
-        solve(board, c, r, 2, _legal_moves[:])
-
-    def _stringify_solutions():
-        solutions_str = []
-        for solution in solutions:
-            solutions_str.append("\n".join([" ".join(map(str, solution[3 * col: 3 * col + 3])) for col in range(3)]))
-        return solutions_str
-
-    return _stringify_solutions()
+        for step, cell in enumerate(path, 1):
+            board[cell] = step
+        solutions_str.append("\n".join([" ".join(map(str, board[3 * col: 3 * col + 3])) for col in range(3)]))
+    return solutions_str
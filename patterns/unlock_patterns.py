@@ -0,0 +1,279 @@
+import operator
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from tqdm import tqdm
+
+
+__all__ = ["count_unlock_patterns", "iterate_unlock_patterns", "iterate_matching_patterns", "pattern_features",
+           "PatternFeatures", "build_unlock_patterns_index", "is_unlock_patterns_index_stale",
+           "UnlockPatternsIndex", "parse_pattern_filter", "find_unlock_patterns"]
+
+
+# Dots of 3x3 lock screen are numbered 0-8 row by row, patterns are printed
+# with 1-9 as on phone keypad. Line between two dots passing through third one
+# selects it, so such move is allowed only if that dot is already visited.
+
+_SIZE = 3
+_DOTS = _SIZE * _SIZE
+
+
+def _between(a: int, b: int) -> Optional[int]:
+    (ar, ac), (br, bc) = divmod(a, _SIZE), divmod(b, _SIZE)
+    if (ar + br) % 2 or (ac + bc) % 2:
+        return None
+    middle = (ar + br) // 2 * _SIZE + (ac + bc) // 2
+    return None if middle in (a, b) else middle
+
+
+_BETWEEN = [[_between(a, b) for b in range(_DOTS)] for a in range(_DOTS)]
+
+
+def _can_move(visited: int, a: int, b: int) -> bool:
+    if visited >> b & 1:
+        return False
+    middle = _BETWEEN[a][b]
+    return middle is None or bool(visited >> middle & 1)
+
+
+def count_unlock_patterns(min_length: int = 4, max_length: int = 9) -> Dict[int, int]:
+    """
+    Number of patterns of every length, dynamic programming over
+    (visited dots mask, last dot). 389112 patterns of lengths 4-9 in total.
+    """
+    ways = [[0] * _DOTS for _ in range(1 << _DOTS)]
+    for dot in range(_DOTS):
+        ways[1 << dot][dot] = 1
+    counts = {length: 0 for length in range(min_length, max_length + 1)}
+    # adding a dot only increases mask, so masks go in increasing order
+    for visited in range(1, 1 << _DOTS):
+        length = bin(visited).count("1")
+        for last in range(_DOTS):
+            current = ways[visited][last]
+            if not current:
+                continue
+            if length in counts:
+                counts[length] += current
+            if length == max_length:
+                continue
+            for dot in range(_DOTS):
+                if _can_move(visited, last, dot):
+                    ways[visited | 1 << dot][dot] += current
+    return counts
+
+
+def iterate_unlock_patterns(min_length: int = 4, max_length: int = 9) -> Iterator[Tuple[int, ...]]:
+    """
+    Yields every pattern as tuple of dots, shorter pattern goes right
+    before patterns continuing it
+    """
+    path: List[int] = []
+
+    def extend(visited: int) -> Iterator[Tuple[int, ...]]:
+        if len(path) >= min_length:
+            yield tuple(path)
+        if len(path) == max_length:
+            return
+        for dot in range(_DOTS):
+            if _can_move(visited, path[-1], dot):
+                path.append(dot)
+                yield from extend(visited | 1 << dot)
+                path.pop()
+
+    for start in range(_DOTS):
+        path.append(start)
+        yield from extend(1 << start)
+        path.pop()
+
+
+@dataclass(frozen=True)
+class PatternFeatures:
+    # dots in pattern
+    length: int
+    # pairs of segments crossing each other
+    crossings: int
+    # segments going like chess knight
+    knights: int
+    # segments passing over already visited dot
+    overpasses: int
+    # segments changing direction of the previous one
+    turns: int
+    # squared length of the longest segment: 1 and 2 for neighbours,
+    # 4 and 8 for passing over a dot, 5 for knight move
+    longest_segment: int
+
+    @property
+    def score(self) -> int:
+        """
+        Rough complexity of pattern for a human eye
+        """
+        return self.length + 3 * self.crossings + 2 * self.knights + 2 * self.overpasses + self.turns
+
+
+def _orientation(a: Tuple[int, int], b: Tuple[int, int], c: Tuple[int, int]) -> int:
+    value = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    return (value > 0) - (value < 0)
+
+
+def _segments_cross(first: Tuple[Tuple[int, int], Tuple[int, int]],
+                    second: Tuple[Tuple[int, int], Tuple[int, int]]) -> bool:
+    (a, b), (c, d) = first, second
+    return (_orientation(a, b, c) * _orientation(a, b, d) < 0
+            and _orientation(c, d, a) * _orientation(c, d, b) < 0)
+
+
+def pattern_features(pattern: Tuple[int, ...]) -> PatternFeatures:
+    points = [divmod(dot, _SIZE) for dot in pattern]
+    segments = list(zip(points, points[1:]))
+    vectors = [(b[0] - a[0], b[1] - a[1]) for a, b in segments]
+    crossings = sum(1 for i in range(len(segments)) for j in range(i + 2, len(segments))
+                    if _segments_cross(segments[i], segments[j]))
+    knights = sum(1 for dr, dc in vectors if {abs(dr), abs(dc)} == {1, 2})
+    overpasses = sum(1 for a, b in zip(pattern, pattern[1:]) if _BETWEEN[a][b] is not None)
+    turns = sum(1 for (r1, c1), (r2, c2) in zip(vectors, vectors[1:]) if r1 * c2 != r2 * c1 or r1 * r2 + c1 * c2 < 0)
+    longest_segment = max((dr * dr + dc * dc for dr, dc in vectors), default=0)
+    return PatternFeatures(len(pattern), crossings, knights, overpasses, turns, longest_segment)
+
+
+def iterate_matching_patterns(conditions: List[Tuple[str, Callable[[int, int], bool], int]],
+                              min_length: int = 4,
+                              max_length: int = 9) -> Iterator[Tuple[int, ...]]:
+    """
+    Streams patterns satisfying conditions (see `parse_pattern_filter`)
+    computing features on the fly, without index
+    """
+    for pattern in iterate_unlock_patterns(min_length, max_length):
+        features = pattern_features(pattern)
+        if all(fn(getattr(features, name), value) for name, fn, value in conditions):
+            yield pattern
+
+
+# Index file: header (magic, version, count), then uint32 codes of patterns
+# (keypad digits of pattern as decimal number, e.g. 1596) and a uint8 column
+# for every feature. About 4 MB for all patterns.
+_MAGIC = b"PZLP"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_COLUMNS = ["length", "crossings", "knights", "overpasses", "turns", "longest_segment", "score"]
+
+
+def _encode(pattern: Tuple[int, ...]) -> int:
+    code = 0
+    for dot in pattern:
+        code = code * 10 + dot + 1
+    return code
+
+
+def build_unlock_patterns_index(filepath: Path) -> None:
+    codes = array("I")
+    columns = {name: array("B") for name in _COLUMNS}
+    for pattern in tqdm(iterate_unlock_patterns(), total=sum(count_unlock_patterns().values()), desc="Patterns"):
+        features = pattern_features(pattern)
+        codes.append(_encode(pattern))
+        for name in _COLUMNS:
+            columns[name].append(getattr(features, name))
+    tmp_filepath = filepath.with_name(filepath.name + ".tmp")
+    with open(tmp_filepath, "wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(codes)))
+        if sys.byteorder != "little":
+            codes.byteswap()
+        fh.write(codes.tobytes())
+        for name in _COLUMNS:
+            fh.write(columns[name].tobytes())
+    os.replace(tmp_filepath, filepath)
+
+
+_OPERATORS = {"<=": operator.le, ">=": operator.ge, "!=": operator.ne,
+              "<": operator.lt, ">": operator.gt, "=": operator.eq}
+
+
+def parse_pattern_filter(text: str) -> List[Tuple[str, Callable[[int, int], bool], int]]:
+    """
+    Parses comma separated conditions like "length=9,crossings>=3"
+    """
+    conditions = []
+    for condition in filter(None, (part.strip() for part in text.split(","))):
+        for symbol, fn in _OPERATORS.items():
+            name, found, value = condition.partition(symbol)
+            if found:
+                name = name.strip()
+                if name not in _COLUMNS:
+                    raise ValueError(f"Unknown pattern feature {name!r}, known ones are: " + ", ".join(_COLUMNS))
+                conditions.append((name, fn, int(value)))
+                break
+        else:
+            raise ValueError(f"Can't parse pattern condition {condition!r}")
+    return conditions
+
+
+def is_unlock_patterns_index_stale(filepath: Path) -> bool:
+    """
+    Index should be rebuilt if it is missing or was written by another format version
+    """
+    if not filepath.exists():
+        return True
+    with open(filepath, "rb") as fh:
+        header = fh.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return True
+    magic, version, _ = _HEADER.unpack(header)
+    return magic != _MAGIC or version != _FORMAT_VERSION
+
+
+class UnlockPatternsIndex:
+    """
+    All unlock patterns with precomputed features, read from index file
+    """
+    def __init__(self, filepath: Path):
+        with open(filepath, "rb") as fh:
+            data = fh.read()
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"{str(filepath)} is not unlock patterns index of version {_FORMAT_VERSION}")
+        cursor = _HEADER.size
+        self.codes = array("I", data[cursor:cursor + 4 * count])
+        if sys.byteorder != "little":
+            self.codes.byteswap()
+        cursor += 4 * count
+        self.columns: Dict[str, array] = {}
+        for name in _COLUMNS:
+            self.columns[name] = array("B", data[cursor:cursor + count])
+            cursor += count
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def query(self, conditions: List[Tuple[str, Callable[[int, int], bool], int]]) -> Iterator[str]:
+        """
+        Yields patterns (keypad digits) satisfying all conditions
+        """
+        matching = range(len(self.codes))
+        for name, fn, value in conditions:
+            column = self.columns[name]
+            matching = [i for i in matching if fn(column[i], value)]
+        for i in matching:
+            yield str(self.codes[i])
+
+
+def find_unlock_patterns(index_filepath: Path, conditions: str) -> List[str]:
+    """
+    Finds phone unlock patterns (4-9 dots, line can't pass over not yet
+    visited dot) by comma separated conditions on their features:
+    length, crossings, knights, overpasses, turns, longest_segment, score
+    (compared with =, !=, <, <=, >, >=). Dots are numbered as on keypad.
+    Index of all 389112 patterns is built on first use. Example:
+    length=9,crossings>=8,knights>=4
+    ---
+    125943867
+    126758349
+    ...
+    """
+    if is_unlock_patterns_index_stale(index_filepath):
+        print("Building unlock patterns index...")
+        build_unlock_patterns_index(index_filepath)
+    return list(UnlockPatternsIndex(index_filepath).query(parse_pattern_filter(conditions)))
@@ -1,30 +1,146 @@
-from typing import List, Dict
-from tqdm import tqdm
-from random import shuffle
+import heapq
+import math
+import random
+from typing import Iterator, List, Optional, Tuple
+from utils.lexicon import Lexicon
+from utils.position_index import PositionIndex
+
+
+# Row of a fill is (word length, position of secret letter in word),
+# negative positions count from the end of word
+Row = Tuple[int, int]
+
+
+def parse_layout(layout: str, secret_length: int) -> List[Row]:
+    """
+    Rows for every letter of secret:
+    "last" - word of length i ends with i-th letter,
+    "first" - word of length i starts with i-th letter,
+    "main" - words as long as secret, i-th letter of i-th word,
+    "anti" - words as long as secret, i-th letter from the end of i-th word,
+    or explicit "LENGTH:POSITION" for every letter separated by semicolon
+    """
+    if layout == "last":
+        return [(i + 1, -1) for i in range(secret_length)]
+    if layout == "first":
+        return [(i + 1, 0) for i in range(secret_length)]
+    if layout == "main":
+        return [(secret_length, i) for i in range(secret_length)]
+    if layout == "anti":
+        return [(secret_length, -1 - i) for i in range(secret_length)]
+    rows = []
+    for row in layout.split(";"):
+        length, _, position = row.partition(":")
+        rows.append((int(length), int(position)))
+    if len(rows) != secret_length:
+        raise ValueError(f"Layout has {len(rows)} rows, but secret has {secret_length} letters")
+    for length, position in rows:
+        if not -length <= position < length:
+            raise ValueError(f"Position {position} is out of word of length {length}")
+    return rows
+
+
+def iterate_best_fills(index: PositionIndex, secret_word: str, rows: List[Row]) -> Iterator[List[Optional[str]]]:
+    """
+    Yields fills (word or None for every row) from the most common one on,
+    fill is scored by product of frequencies of its words. Rows without
+    any fitting word are left empty. Words of a fill are distinct.
+    Fills are popped from heap of index vectors into candidate lists,
+    so only neighbours of already yielded fills are ever scored.
+    """
+    candidates = [index.words(length, position, letter) for (length, position), letter in zip(rows, secret_word)]
+    filled = [i for i, words in enumerate(candidates) if words]
+    log_frequencies = [[math.log(max(index.frequency(word), 1e-12)) for word in candidates[i]] for i in filled]
+
+    def score(vector: Tuple[int, ...]) -> float:
+        return sum(row_scores[j] for row_scores, j in zip(log_frequencies, vector))
+
+    start = (0,) * len(filled)
+    heap = [(-score(start), start)]
+    seen = {start}
+    while heap:
+        _, vector = heapq.heappop(heap)
+        words = [candidates[i][j] for i, j in zip(filled, vector)]
+        if len(set(words)) == len(words):
+            fill: List[Optional[str]] = [None] * len(rows)
+            for i, word in zip(filled, words):
+                fill[i] = word
+            yield fill
+        for k in range(len(vector)):
+            if vector[k] + 1 < len(log_frequencies[k]):
+                neighbour = vector[:k] + (vector[k] + 1,) + vector[k + 1:]
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    heapq.heappush(heap, (-score(neighbour), neighbour))
+
+
+def sample_fill(index: PositionIndex, secret_word: str, rows: List[Row], rng: random.Random) -> List[Optional[str]]:
+    """
+    Random fill, more common words are more likely. Rows without any fitting word are left empty.
+    """
+    fill: List[Optional[str]] = []
+    for (length, position), letter in zip(rows, secret_word):
+        word = index.sample(length, position, letter, rng)
+        if word in fill:
+            # words of fill are distinct
+            left = [other for other in index.words(length, position, letter) if other not in fill]
+            word = rng.choice(left) if left else None
+        fill.append(word)
+    return fill
+
+
+def _format_fill(fill: List[Optional[str]], rows: List[Row]) -> str:
+    lines = []
+    for word, (length, position) in zip(fill, rows):
+        if word is None:
+            lines.append("-")
+            continue
+        position %= length
+        lines.append(f"{word[:position]}[{word[position]}]{word[position + 1:]}")
+    return "\n".join(lines)
+
+
+def diagonal_fill(lexicon: Lexicon,
+                  secret_word: str,
+                  layout: str = "main",
+                  count: str = "10",
+                  seed: Optional[str] = None) -> str:
+    """
+    Provides fills of words whose letters at given positions form secret word,
+    the most common ones first, or random ones (more common words are more
+    likely) if SEED is given. LAYOUT is "main" (letters on main diagonal of
+    square of words as long as secret), "anti" (other diagonal), "last",
+    "first" (words of growing length, see diagonal_fill_last/first) or explicit
+    "LENGTH:POSITION;..." for every letter, positions from the end are negative.
+    Example:
+        кот,main,1
+        [к]ит
+        с[о]к
+        ко[т]
+    """
+    rows = parse_layout(layout, len(secret_word))
+    index = lexicon.position_index(["nouns"])
+    if seed is None:
+        fills = iterate_best_fills(index, secret_word, rows)
+        chosen = [fill for fill, _ in zip(fills, range(int(count)))]
+    else:
+        rng = random.Random(int(seed))
+        chosen = [sample_fill(index, secret_word, rows, rng) for _ in range(int(count))]
+    return "\n---\n".join(_format_fill(fill, rows) for fill in chosen)
 
 
 def diagonal_fill_to_square(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         secret_word: str,
         index: int):
-    nouns_by_size = {}
-    for noun in all_words_by_class["nouns"][:10000]:  # take more or less known words...
-        if len(noun) <= len(secret_word):
-            nouns_by_size.setdefault(len(noun), []).append(noun)
-    result = {}
-    total = len(nouns_by_size.keys())
-    for size in tqdm(sorted(list(nouns_by_size.keys()), reverse=True), total=total):
-        nouns = nouns_by_size[size]
-        shuffle(nouns)  # ...but shuffle then to make encoding different
-        for noun in nouns:
-            if noun[index] == secret_word[size-1]:
-                result[size] = noun
-                break
-    return "\n".join((result[s] for s in sorted(list(result.keys()))))
+    # random fill to make encoding different, common words are more likely
+    rows = [(size, index) for size in range(1, len(secret_word) + 1)]
+    fill = sample_fill(lexicon.position_index(["nouns"]), secret_word, rows, random.Random())
+    return "\n".join(word for word in fill if word is not None)
 
 
 def diagonal_fill_to_square_last(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         secret_word: str):
     """
     Provides list of words with missing LAST letter. Filled LAST letters form new word.
@@ -47,11 +163,11 @@ def diagonal_fill_to_square_last(
         -----?
     With "-" as any other letters
     """
-    return diagonal_fill_to_square(all_words_by_class, secret_word, -1)
+    return diagonal_fill_to_square(lexicon, secret_word, -1)
 
 
 def diagonal_fill_to_square_first(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         secret_word: str):
     """
     Provides list of words with missing FIRST letter. Filled FIRST letters form new word.
@@ -74,4 +190,4 @@ def diagonal_fill_to_square_first(
         -----к
     With "-" as any other letters
     """
-    return diagonal_fill_to_square(all_words_by_class, secret_word, 0)
+    return diagonal_fill_to_square(lexicon, secret_word, 0)
@@ -1,7 +1,9 @@
 from io import StringIO
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 from utils.word_validation import is_russian_vowel
+from utils.lexicon import Lexicon
+from utils.vowel_mask_index import VowelMaskIndex
 
 
 def validate_image(image_lines: List[str]):
@@ -16,26 +18,48 @@ def vowels_as_b_consonant_as_w(word: str) -> str:
     return "".join(("B" if is_russian_vowel(char) else "W") for char in word)
 
 
-def format_output(image_coding_variants: Dict[str, List[str]]) -> str:
+def encode_image(index: VowelMaskIndex,
+                 image_lines: List[str],
+                 max_distance: int = 0) -> Dict[str, List[Tuple[int, str]]]:
+    """
+    Words for every line as (distance, word). Words matching line exactly
+    have distance 0, near matches are given only if there are no exact ones.
+    """
+    validate_image(image_lines)
+    image_coding_variants = {}
+    for line in image_lines:
+        variants = [(0, word) for word in index.exact(line)]
+        if not variants and max_distance:
+            variants = index.nearest(line, max_distance)
+        if not variants:
+            raise ValueError(f"Words for line {line!r} not found")
+        image_coding_variants[line] = variants
+    return image_coding_variants
+
+
+def format_output(image_coding_variants: Dict[str, List[Tuple[int, str]]]) -> str:
     buffer = StringIO()
     for line, words in image_coding_variants.items():
         buffer.write(line)
         buffer.write(":\n")
-        for word in words:
+        for distance, word in words:
             buffer.write("\t")
             buffer.write(word)
+            if distance:
+                buffer.write(f" ({vowels_as_b_consonant_as_w(word)}, {distance} off)")
             buffer.write("\n")
         buffer.write("---\n")
     return buffer.getvalue()
 
 
-def hide_image(all_words_by_class: Dict[str, List[str]], image_strrepr: str) -> str:
+def hide_image(lexicon: Lexicon, image_strrepr: str, max_distance: str = "0") -> str:
     """
     Hides image in words.
     Image string representation should contain lines of image separated by semicolon
     Lines of image should contain only "B" and "W" characters
     Algorithm output list of words for every line where vowels encode black pixels
-    and consonants - white pixels
+    and consonants - white pixels. If MAX_DISTANCE is given, lines without
+    such words get words differing in up to that many letters.
     Example:
     BBWW;WWBB
 
@@ -50,16 +74,5 @@ def hide_image(all_words_by_class: Dict[str, List[str]], image_strrepr: str) ->
         хвоя
         ...
     """
-    image_lines = image_strrepr.split(";")
-    validate_image(image_lines)
-    nouns = [word for word in all_words_by_class["nouns"] if len(word) == len(image_lines[0])]
-    coding_words = {word: vowels_as_b_consonant_as_w(word) for word in nouns}
-    image_coding_variants = {}
-    for line in image_lines:
-        image_coding_variants[line] = []
-        for word, coding in coding_words.items():
-            if coding == line:
-                image_coding_variants[line].append(word)
-        if not image_coding_variants[line]:
-            raise ValueError(f"Words for line {line!r} not found")
-    return format_output(image_coding_variants)
+    index = lexicon.vowel_masks(["nouns"])
+    return format_output(encode_image(index, image_strrepr.split(";"), int(max_distance)))
@@ -1,36 +1,112 @@
-from typing import List, Dict
-from tqdm import tqdm
+import heapq
+from typing import Dict, Iterator, List, Tuple
+from utils.lexicon import Lexicon
+
+
+STARTING_POS = ("nouns",)
+ENDING_POS = ("nouns", "verbs", "adjectives")
+
+
+class _SplitIndex:
+    """
+    Words which can start a phrase (end with secret[:i]) and end it
+    (start with secret[i:]) for every split point i of the secret, most
+    common ones first. Outer word may be its part alone (as "во" in
+    "во, семья"), but never contains the whole secret.
+    """
+    def __init__(self, lexicon: Lexicon, secret_word: str):
+        self.secret_word = secret_word
+        suffix_trie = lexicon.suffix_trie(STARTING_POS)
+        prefix_trie = lexicon.prefix_trie(ENDING_POS)
+        self.starting: Dict[int, List[str]] = {}
+        self.ending: Dict[int, List[str]] = {}
+        for i in range(1, len(secret_word)):
+            head, tail = secret_word[:i], secret_word[i:]
+            self.starting[i] = self._ranked(lexicon, STARTING_POS, suffix_trie.words_with_prefix(head[::-1]))
+            self.ending[i] = self._ranked(lexicon, ENDING_POS, prefix_trie.words_with_prefix(tail))
+
+    def _ranked(self, lexicon: Lexicon, parts_of_speech: Tuple[str, ...], words: List[str]) -> List[str]:
+        words = {word for word in words if self.secret_word not in word}
+        return sorted(words, key=lambda word: (-lexicon.frequency(word, parts_of_speech), word))
+
+
+def _middle_paths(lexicon: Lexicon, secret_word: str, max_middle_words: int) -> Iterator[Tuple[int, Tuple[str, ...], int]]:
+    """
+    Yields (first split, whole words in between, last split): secret is
+    split by points first < ... < last, every piece between them is a word
+    """
+    vocabulary = lexicon.word_set()
+    n = len(secret_word)
+    # words[i] - (word, j) for words equal to secret[i:j], j leaves something for the last word
+    words = [[(secret_word[i:j], j) for j in range(i + 1, n) if secret_word[i:j] in vocabulary] for i in range(n)]
+
+    def extend(first: int, i: int, middle: Tuple[str, ...]) -> Iterator[Tuple[int, Tuple[str, ...], int]]:
+        yield first, middle, i
+        if len(middle) < max_middle_words:
+            for word, j in words[i]:
+                yield from extend(first, j, middle + (word,))
+
+    for first in range(1, n):
+        yield from extend(first, first, ())
+
+
+def iterate_in_between_phrases(lexicon: Lexicon,
+                               secret_word: str,
+                               max_phrase_words: int = 2) -> Iterator[Tuple[str, ...]]:
+    """
+    Yields phrases of 2 to `max_phrase_words` words hiding secret across
+    their boundaries, the most common (by rarest word) first. Every starting
+    and every ending word is used in one phrase only.
+    Phrases of every split path are paired from the most common starting
+    and ending words on, and paths are merged lazily, so only as many
+    candidates are looked at as phrases are taken.
+    """
+    index = _SplitIndex(lexicon, secret_word)
+    paths = [(first, middle, last) for first, middle, last in _middle_paths(lexicon, secret_word, max_phrase_words - 2)
+             if index.starting[first] and index.ending[last]]
+    # (-commonness, path idx, starting word idx, ending word idx)
+    heap = []
+
+    def push(path_idx: int, start_idx: int, end_idx: int):
+        first, middle, last = paths[path_idx]
+        if start_idx < len(index.starting[first]) and end_idx < len(index.ending[last]):
+            phrase = (index.starting[first][start_idx],) + middle + (index.ending[last][end_idx],)
+            heapq.heappush(heap, (-lexicon.commonness(phrase), path_idx, start_idx, end_idx))
+
+    for path_idx in range(len(paths)):
+        push(path_idx, 0, 0)
+    used_starting, used_ending = set(), set()
+    while heap:
+        _, path_idx, start_idx, end_idx = heapq.heappop(heap)
+        first, middle, last = paths[path_idx]
+        starting, ending = index.starting[first][start_idx], index.ending[last][end_idx]
+        if starting in used_starting:
+            push(path_idx, start_idx + 1, end_idx)
+        elif ending in used_ending:
+            push(path_idx, start_idx, end_idx + 1)
+        else:
+            used_starting.add(starting)
+            used_ending.add(ending)
+            yield (starting,) + middle + (ending,)
+            push(path_idx, start_idx + 1, end_idx + 1)
 
 
 def hide_in_between_words(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         secret_word: str,
-        max_words_num: str = "100"):
+        max_words_num: str = "100",
+        max_phrase_words: str = "2"):
     """
-    Provides list of pairs of words to hide secret words in between
+    Provides list of phrases to hide secret words in between, secret may
+    span several words if MAX_PHRASE_WORDS is given (2 by default)
     Example:
     восемь,10
     слово, семья -> сло/ВО СЕМЬ/я
     право, семьянин -> пра/ВО СЕМЬ/ьянин
     """
-    max_words_num = int(max_words_num)
-    possible_starting_words = all_words_by_class["nouns"]
-    possible_starting_words = [word for word in possible_starting_words
-                               if word.find(secret_word[0]) != -1 and word.find(secret_word) == -1]
-    possible_ending_words = all_words_by_class["nouns"]\
-                            + all_words_by_class["verbs"]\
-                            + all_words_by_class["adjectives"]
-    possible_ending_words = [word for word in possible_ending_words
-                             if word.find(secret_word[-1]) != -1 and word.find(secret_word) == -1]
-    pairs = []
-    for word1 in tqdm(possible_starting_words, total=len(possible_starting_words)):
-        for idx, word2 in enumerate(possible_ending_words):
-            merge = word1 + word2
-            if merge.find(secret_word) != -1:
-                pairs.append((word1, word2))
-                possible_ending_words.pop(idx)
-                max_words_num -= 1
-                break
-        if max_words_num <= 0:
+    phrases = []
+    for phrase in iterate_in_between_phrases(lexicon, secret_word, int(max_phrase_words)):
+        if len(phrases) >= int(max_words_num):
             break
-    return "\n".join([", ".join(pair) for pair in pairs])
+        phrases.append(phrase)
+    return "\n".join([", ".join(phrase) for phrase in phrases])
@@ -1,35 +1,37 @@
 import random
 from io import StringIO
-from typing import List, Dict, Union
-from itertools import islice, chain
+from typing import List, Optional, Union
+from itertools import chain
+from utils.lexicon import Lexicon
 
 
 def hide_in_words_overlap(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         secret_word: str,
-        count: Union[str, int] = 20):
+        count: Union[str, int] = 20,
+        seed: Optional[Union[str, int]] = None):
     """
     Provides list of words encoding secret word. Last letter of first word and
     first letter of next word represent one letter of secret word.
+    Words are picked at random, pass SEED to get the same ones again.
     """
     count = int(count)
-    nouns = all_words_by_class["nouns"]
-    random.shuffle(nouns)  # for different results from different runs
-    words_by_letter = {}
-    for noun in nouns:
-        words_by_letter.setdefault(noun[0], []).append(noun)
+    # for different results from different runs unless seed is given
+    rng = random.Random(None if seed is None else int(seed))
+    by_first = lexicon.by_first_letter(["nouns"])
+    by_last = lexicon.by_last_letter(["nouns"])
+    by_first_last = lexicon.by_first_last_letters(["nouns"])
 
     buffer = StringIO()
-    for first_letter, last_letter in zip(chain([None], secret_word), secret_word):
+    for first_letter, last_letter in zip(chain([None], secret_word), chain(secret_word, [None])):
         if first_letter is None:
-            subresult = islice(filter(
-                lambda w: w[-1] == last_letter, nouns), count)
+            bucket = by_last.get(last_letter, [])
         elif last_letter is None:
-            subresult = islice(filter(
-                lambda w: w[0] == first_letter, nouns), count)
+            bucket = by_first.get(first_letter, [])
         else:
-            subresult = islice(filter(
-                lambda w: w[0] == first_letter and w[-1] == last_letter, nouns), count)
+            bucket = by_first_last.get((first_letter, last_letter), [])
+        # sample picks without touching (shared) bucket
+        subresult: List[str] = rng.sample(bucket, min(count, len(bucket)))
 
         buffer.write(f"{first_letter}-{last_letter}:\n")
         buffer.write("\n".join(subresult))
@@ -1,12 +1,12 @@
 from collections import Counter, defaultdict
 from random import shuffle
-from typing import List, Dict
 
 from utils.word_validation import validate_word
+from utils.lexicon import Lexicon
 
 
 def hide_letters_before_sequence(
-        all_words_by_class: Dict[str, List[str]], secret_word: str, sequence: str):
+        lexicon: Lexicon, secret_word: str, sequence: str):
     """
     Hides secret word one letter by one in other words before every designated
     marking sequence of words.
@@ -15,7 +15,7 @@ def hide_letters_before_sequence(
     высокотехнологический мягкотелость чукотский коверкотовый щекотать
     выс/о/КОТ/ехнологический мя/г/КОТ/елость ч/у/КОТ/ский кове/р/КОТ/овый щ/е/КОТ/ать
     """
-    words = all_words_by_class["nouns"] + all_words_by_class["verbs"] + all_words_by_class["adjectives"]
+    words = lexicon["nouns"] + lexicon["verbs"] + lexicon["adjectives"]
     shuffle(words)
     validate_word(secret_word)
     secret_word = secret_word.lower()
@@ -1,13 +1,12 @@
 from collections import Counter, defaultdict
 from random import shuffle
 
-from typing import List, Dict
-
 from utils.word_validation import is_cyrillic
+from utils.lexicon import Lexicon
 
 
 def hide_in_nth_letters(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         secret_word: str,
         nth_letter: str):
     """
@@ -19,9 +18,8 @@ def hide_in_nth_letters(
     меСторождение неЯркий осВещать узБекский шлАнг каРманный увЕсти
     """
     nth_letter = int(nth_letter)
-    words = all_words_by_class["nouns"][1000:5000] \
-            + all_words_by_class["verbs"][1000:5000] \
-            + all_words_by_class["adjectives"][1000:5000]
+    # skip the most trivial words but keep well-known ones
+    words = list(lexicon.rank_band(1000, 5000).words(["nouns", "verbs", "adjectives"]))
     shuffle(words)
     if not any([is_cyrillic(l) for l in secret_word]):
         raise RuntimeError("Found non cyrillic symbol or space or hyphen")
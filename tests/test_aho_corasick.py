@@ -0,0 +1,24 @@
+import random
+
+from utils.aho_corasick import AhoCorasick
+
+
+def _naive_matches(words, text):
+    return {(start, word) for word in set(words) if word
+            for start in range(len(text)) if text.startswith(word, start)}
+
+
+def test_matches_agree_with_naive_scan():
+    rng = random.Random(12)
+    for _ in range(200):
+        words = ["".join(rng.choice("аб") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        text = "".join(rng.choice("абв") for _ in range(rng.randint(0, 20)))
+        matches = list(AhoCorasick(words).matches(text))
+        assert len(matches) == len(set(matches))
+        assert set(matches) == _naive_matches(words, text)
+
+
+def test_words_ending_inside_longer_words_are_found():
+    automaton = AhoCorasick(["дар", "удар", "суд", "д"])
+    assert sorted(automaton.matches("государство")) == [(2, "суд"), (3, "удар"), (4, "д"), (4, "дар")]
+    assert automaton.words == ["дар", "удар", "суд", "д"]
@@ -0,0 +1,73 @@
+import re
+from itertools import combinations, product
+
+import pytest
+
+from mathy.matchsticks import GLYPH_STICKS, generate_matchstick_puzzles, solve_matchsticks, stick_count, to_roman
+
+_VALUES = {to_roman(n): n for n in range(1, 4000) if to_roman(n)}
+
+
+def _is_true(text):
+    left, equals, right = text.partition("=")
+    if not equals or "=" in right or right not in _VALUES:
+        return False
+    terms = re.split(r"([+\-x])", left)
+    if any(term not in _VALUES for term in terms[::2]):
+        return False
+    expression = "".join(str(_VALUES[term]) if i % 2 == 0 else term.replace("x", "*") for i, term in enumerate(terms))
+    return eval(expression) == _VALUES[right]
+
+
+def _brute_force(equation, sticks, mode):
+    """
+    Every way to change glyphs of cells (empty cells around glyphs included)
+    spending exactly the stick budget. Every changed cell takes or gives
+    at least one stick, so a move changes at most 2 * sticks cells.
+    """
+    removed_budget, added_budget = {"move": (sticks, sticks), "add": (0, sticks), "remove": (sticks, 0)}[mode]
+    cells = [""]
+    for glyph in equation.replace(" ", ""):
+        cells += [glyph, ""]
+    found = set()
+    for changed_count in range(1, removed_budget + added_budget + 1):
+        for changed in combinations(range(len(cells)), changed_count):
+            for glyphs in product(GLYPH_STICKS, repeat=changed_count):
+                if any(glyph == cells[i] for i, glyph in zip(changed, glyphs)):
+                    continue
+                removed = sum(len(GLYPH_STICKS[cells[i]] - GLYPH_STICKS[glyph]) for i, glyph in zip(changed, glyphs))
+                added = sum(len(GLYPH_STICKS[glyph] - GLYPH_STICKS[cells[i]]) for i, glyph in zip(changed, glyphs))
+                if (removed, added) != (removed_budget, added_budget):
+                    continue
+                new_cells = list(cells)
+                for i, glyph in zip(changed, glyphs):
+                    new_cells[i] = glyph
+                text = "".join(new_cells)
+                if _is_true(text):
+                    found.add(text)
+    return found
+
+
+@pytest.mark.parametrize("equation", ["XI+I=X", "I+II=II", "I+III=II", "IxIII=II", "I-I=I", "V-I=II", "XxII=X", "L-X=XX"])
+@pytest.mark.parametrize("sticks, mode", [(1, "move"), (1, "add"), (1, "remove"), (2, "add"), (2, "remove")])
+def test_solver_matches_brute_force(equation, sticks, mode):
+    solutions = {solution.replace(" ", "") for solution in solve_matchsticks(equation, sticks, mode)}
+    assert solutions == _brute_force(equation, sticks, mode)
+
+
+def test_solver_spends_exact_stick_budget():
+    for solution in solve_matchsticks("XI+I=X", 1, "add"):
+        assert stick_count(solution) == stick_count("XI+I=X") + 1
+
+
+def test_generated_puzzles_have_the_only_solution():
+    puzzles = list(generate_matchstick_puzzles(max_number=6, sticks=1, mode="move"))
+    assert puzzles
+    for puzzle_idx, (puzzle, solution) in enumerate(puzzles):
+        assert solve_matchsticks(puzzle, 1, "move") == [solution]
+        puzzle, solution = puzzle.replace(" ", ""), solution.replace(" ", "")
+        assert not _is_true(puzzle) and _is_true(solution)
+        assert stick_count(puzzle) == stick_count(solution)
+        # brute force is slow, every 16th puzzle is enough
+        if puzzle_idx % 16 == 0:
+            assert _brute_force(puzzle, 1, "move") == {solution}
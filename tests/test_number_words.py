@@ -0,0 +1,71 @@
+import pytest
+
+from mathy.number_words import number_to_words, letter_lengths, letters_count
+from utils.language import Language
+
+
+@pytest.mark.parametrize("n, words", [
+    (0, "ноль"),
+    (1, "один"),
+    (12, "двенадцать"),
+    (21, "двадцать один"),
+    (100, "сто"),
+    (1000, "тысяча"),
+    (1001, "тысяча один"),
+    (2000, "две тысячи"),
+    (4000, "четыре тысячи"),
+    (5000, "пять тысяч"),
+    (11000, "одиннадцать тысяч"),
+    (21000, "двадцать одна тысяча"),
+    (22000, "двадцать две тысячи"),
+    (111000, "сто одиннадцать тысяч"),
+    (1000000, "миллион"),
+    (2000000, "два миллиона"),
+    (5000000, "пять миллионов"),
+    (21000000, "двадцать один миллион"),
+    (1000001, "миллион один"),
+    # "одна" is dropped only before a scale word leading the number
+    (1001000, "миллион одна тысяча"),
+    (2001000, "два миллиона одна тысяча"),
+    (1001001001, "миллиард один миллион одна тысяча один"),
+    (999999999999, "девятьсот девяносто девять миллиардов девятьсот девяносто девять миллионов "
+                   "девятьсот девяносто девять тысяч девятьсот девяносто девять"),
+])
+def test_russian_forms(n, words):
+    assert number_to_words(n, Language.RUSSIAN) == words
+
+
+@pytest.mark.parametrize("n, words", [
+    (0, "zero"),
+    (15, "fifteen"),
+    (2021, "two thousand twenty-one"),
+    (1000000, "one million"),
+    (1001000, "one million one thousand"),
+    (700000010, "seven hundred million ten"),
+])
+def test_english_forms(n, words):
+    assert number_to_words(n, Language.ENGLISH) == words
+
+
+def test_thousands_agree_with_their_count():
+    for n in range(1, 1000):
+        last_word = number_to_words(n * 1000, Language.RUSSIAN).split()[-1]
+        if n % 10 == 1 and n % 100 != 11:
+            assert last_word == "тысяча", n
+        elif n % 10 in (2, 3, 4) and n % 100 not in (12, 13, 14):
+            assert last_word == "тысячи", n
+        else:
+            assert last_word == "тысяч", n
+
+
+def test_out_of_range():
+    with pytest.raises(ValueError):
+        number_to_words(-1, Language.RUSSIAN)
+    with pytest.raises(ValueError):
+        number_to_words(10 ** 12, Language.ENGLISH)
+
+
+def test_letter_lengths():
+    numbers = [0, 7, 1001000]
+    assert letter_lengths(numbers, Language.RUSSIAN).tolist() == \
+        [letters_count(number_to_words(n, Language.RUSSIAN)) for n in numbers] == [4, 4, 17]
@@ -0,0 +1,22 @@
+from utils.lexicon import Lexicon
+from words_condition.sandwichable_words import find_sandwichable_words_multistuffing
+
+
+def _lexicon(nouns):
+    return Lexicon({"nouns": nouns, "verbs": [], "adjectives": []})
+
+
+def test_multistuffing_counts_every_part_word_once():
+    # "ода" has both "о" and "а", so the old vowel presplitting searched it
+    # twice in "подарок" and the container passed with only 3 distinct parts
+    assert find_sandwichable_words_multistuffing(_lexicon(["подарок", "ода", "дар", "рок"])) == {}
+
+
+def test_multistuffing_keeps_containers_with_four_distinct_parts():
+    result = find_sandwichable_words_multistuffing(_lexicon(["подарок", "ода", "дар", "рок", "под"]))
+    assert result == {"подарок": ["ода", "дар", "рок", "под"]}
+
+
+def test_multistuffing_top_k_keeps_the_most_common_containers():
+    nouns = ["подарок", "пароход", "ода", "дар", "рок", "под", "пар", "ход", "аро"]
+    assert list(find_sandwichable_words_multistuffing(_lexicon(nouns), top_k=1)) == ["подарок"]
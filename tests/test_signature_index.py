@@ -0,0 +1,51 @@
+import random
+from collections import Counter
+
+from anagrams.signature_index import SignatureIndex
+
+
+def _random_words(rng, count):
+    return ["".join(rng.choice("абвгде") for _ in range(rng.randint(1, 7))) for _ in range(count)]
+
+
+def _naive_sub_anagrams(words, letters, blanks, min_length):
+    found = set()
+    for word in set(words):
+        missing = Counter(word) - Counter(letters)
+        if len(word) >= min_length and sum(missing.values()) <= blanks:
+            found.add(word)
+    return found
+
+
+def test_sub_anagrams_agree_with_naive_check(tmp_path):
+    rng = random.Random(10)
+    words = _random_words(rng, 500)
+    built = SignatureIndex.from_words(words)
+    built.save(tmp_path / "signatures.bin")
+    loaded = SignatureIndex.load(tmp_path / "signatures.bin")
+    for _ in range(100):
+        letters = "".join(rng.choice("абвгдеж") for _ in range(rng.randint(0, 7)))
+        blanks = rng.randint(0, 2)
+        min_length = rng.randint(1, 4)
+        expected = _naive_sub_anagrams(words, letters, blanks, min_length)
+        for index in (built, loaded):
+            found = index.sub_anagrams(letters + "?" * blanks, min_length)
+            assert len(found) == len(set(found))
+            assert set(found) == expected
+            assert [len(word) for word in found] == sorted((len(word) for word in found), reverse=True)
+
+
+def test_anagrams_use_all_letters(tmp_path):
+    words = ["кот", "ток", "кто", "кит", "око", "кок"]
+    SignatureIndex.from_words(words).save(tmp_path / "signatures.bin")
+    index = SignatureIndex.load(tmp_path / "signatures.bin")
+    assert sorted(index.anagrams("ТОК")) == ["кот", "кто", "ток"]
+    assert sorted(index.anagrams("к?т")) == ["кит", "кот", "кто", "ток"]
+    assert sorted(index.anagrams("*о*")) == ["кок", "кот", "кто", "око", "ток"]
+    assert index.anagrams("кошка") == []
+
+
+def test_empty_index(tmp_path):
+    SignatureIndex.from_words([]).save(tmp_path / "signatures.bin")
+    index = SignatureIndex.load(tmp_path / "signatures.bin")
+    assert index.sub_anagrams("абв??") == [] and index.anagrams("аб") == []
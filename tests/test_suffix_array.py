@@ -0,0 +1,54 @@
+import random
+
+from utils.suffix_array import SuffixArray
+from utils.word_trie import WordTrie
+
+
+def _random_words(rng, count, min_length, max_length, alphabet="абвг"):
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(min_length, max_length))) for _ in range(count)]
+
+
+def _naive_occurrences(words, pattern):
+    return {(word_idx, offset) for word_idx, word in enumerate(words)
+            for offset in range(len(word)) if word.startswith(pattern, offset)}
+
+
+def _naive_gapped(words, first, gap_words, second):
+    found = set()
+    for word_idx, offset in _naive_occurrences(words, first):
+        for gap in gap_words:
+            end = offset + len(first) + len(gap)
+            if words[word_idx].startswith(first + gap, offset) and \
+                    (second is None or words[word_idx].startswith(second, end)):
+                found.add((word_idx, offset, gap))
+    return found
+
+
+def test_occurrences_match_naive_scan():
+    rng = random.Random(13)
+    words = _random_words(rng, 200, 1, 10)
+    index = SuffixArray(words)
+    for pattern in _random_words(rng, 100, 1, 4):
+        occurrences = list(index.occurrences(pattern))
+        assert len(occurrences) == len(set(occurrences)) == index.count(pattern)
+        assert set(occurrences) == _naive_occurrences(words, pattern)
+
+
+def test_gapped_matches_naive_scan():
+    rng = random.Random(31)
+    words = _random_words(rng, 200, 3, 12)
+    index = SuffixArray(words)
+    for _ in range(100):
+        first = _random_words(rng, 1, 1, 2)[0]
+        gap_words = set(_random_words(rng, rng.randint(1, 5), 1, 3))
+        second = rng.choice([None] + _random_words(rng, 3, 1, 2))
+        found = list(index.gapped(first, WordTrie(sorted(gap_words)), second))
+        assert len(found) == len(set(found))
+        assert set(found) == _naive_gapped(words, first, gap_words, second)
+
+
+def test_gapped_reports_nested_gap_words():
+    # "во" and "воз" both fit after "пере" in "перевозка"
+    index = SuffixArray(["перевозка"])
+    assert sorted(gap for _, _, gap in index.gapped("пере", WordTrie(["во", "воз"]))) == ["во", "воз"]
+    assert [gap for _, _, gap in index.gapped("пере", WordTrie(["во", "воз"]), "ка")] == ["воз"]
@@ -0,0 +1,45 @@
+import struct
+from itertools import permutations
+
+from patterns import unlock_patterns
+from patterns.unlock_patterns import count_unlock_patterns, is_unlock_patterns_index_stale, iterate_unlock_patterns
+
+
+def _is_valid(pattern):
+    # line between two dots passes over the dot halfway between them, if there is one
+    for i, (a, b) in enumerate(zip(pattern, pattern[1:])):
+        (ar, ac), (br, bc) = divmod(a, 3), divmod(b, 3)
+        if (ar + br) % 2 == 0 and (ac + bc) % 2 == 0:
+            middle = (ar + br) // 2 * 3 + (ac + bc) // 2
+            if middle not in pattern[:i + 1]:
+                return False
+    return True
+
+
+def test_counts_agree_with_brute_force():
+    brute_force = {length: sum(1 for pattern in permutations(range(9), length) if _is_valid(pattern))
+                   for length in range(1, 7)}
+    assert count_unlock_patterns(1, 6) == brute_force
+
+
+def test_known_counts():
+    counts = count_unlock_patterns()
+    assert counts == {4: 1624, 5: 7152, 6: 26016, 7: 72912, 8: 140704, 9: 140704}
+    assert sum(counts.values()) == 389112
+
+
+def test_iteration_agrees_with_counts():
+    patterns = list(iterate_unlock_patterns(4, 6))
+    assert len(patterns) == len(set(patterns)) == sum(count_unlock_patterns(4, 6).values())
+    assert all(_is_valid(pattern) for pattern in patterns)
+
+
+def test_index_of_other_version_is_stale(tmp_path):
+    filepath = tmp_path / "unlock_patterns.bin"
+    assert is_unlock_patterns_index_stale(filepath)
+    filepath.write_bytes(struct.pack("<4sII", b"PZLP", 0, 0))
+    assert is_unlock_patterns_index_stale(filepath)
+    filepath.write_bytes(b"PZ")
+    assert is_unlock_patterns_index_stale(filepath)
+    filepath.write_bytes(struct.pack("<4sII", b"PZLP", unlock_patterns._FORMAT_VERSION, 0))
+    assert not is_unlock_patterns_index_stale(filepath)
@@ -0,0 +1,35 @@
+import itertools
+import random
+
+from utils.lexicon import Lexicon, least_rotation, reversal_key
+
+
+def _naive_least_rotation(word):
+    return min((word[i:] + word[:i] for i in range(len(word))), default="")
+
+
+def test_least_rotation_matches_naive_on_all_short_words():
+    for length in range(1, 8):
+        for letters in itertools.product("аб", repeat=length):
+            word = "".join(letters)
+            assert least_rotation(word) == _naive_least_rotation(word), word
+
+
+def test_least_rotation_matches_naive_on_random_words():
+    rng = random.Random(14)
+    for _ in range(2000):
+        word = "".join(rng.choice("абвг") for _ in range(rng.randint(1, 15)))
+        assert least_rotation(word) == _naive_least_rotation(word), word
+
+
+def test_least_rotation_of_empty_word():
+    assert least_rotation("") == ""
+
+
+def test_rotation_and_reversal_groups():
+    lexicon = Lexicon({"nouns": ["кабан", "банка", "анкаб", "кот", "ток", "кто"]})
+    assert sorted(map(sorted, lexicon.by_rotation().values())) == \
+        [["анкаб", "банка", "кабан"], ["кот"], ["кто", "ток"]]
+    assert sorted(map(sorted, lexicon.by_reversal().values())) == \
+        [["анкаб"], ["банка"], ["кабан"], ["кот", "ток"], ["кто"]]
+    assert reversal_key("ток") == reversal_key("кот") == "кот"
@@ -0,0 +1,77 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+__all__ = ["AhoCorasick"]
+
+
+class AhoCorasick:
+    """
+    Automaton finding all occurrences of many words in a text in one pass
+    over it, no matter how many words there are. Build once, then feed it
+    every text (container word) to search in.
+    Example:
+    >>> automaton = AhoCorasick(["дар", "удар", "суд"])
+    >>> sorted(automaton.contained("государство"))
+    ['дар', 'суд', 'удар']
+    """
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # index of the word ending in state, -1 if none
+        self._word_at: List[int] = [-1]
+        # nearest state down the fail chain where some word ends, -1 if none
+        self._output_link: List[int] = [-1]
+        for word in words:
+            self._add(word)
+        self._link()
+
+    def _add(self, word: str) -> None:
+        if not word:
+            return
+        state = 0
+        for letter in word:
+            next_state = self._goto[state].get(letter)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][letter] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._word_at.append(-1)
+                self._output_link.append(-1)
+            state = next_state
+        if self._word_at[state] == -1:
+            self._word_at[state] = len(self.words)
+            self.words.append(word)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for letter, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and letter not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(letter, 0)
+                self._fail[next_state] = fail
+                self._output_link[next_state] = fail if self._word_at[fail] != -1 else self._output_link[fail]
+
+    def matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yields (start position, word) for every occurrence of every word in text
+        """
+        goto, fail, word_at, output_link = self._goto, self._fail, self._word_at, self._output_link
+        state = 0
+        for end, letter in enumerate(text, 1):
+            while state and letter not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(letter, 0)
+            match = state if word_at[state] != -1 else output_link[state]
+            while match != -1:
+                word = self.words[word_at[match]]
+                yield end - len(word), word
+                match = output_link[match]
+
+    def contained(self, text: str) -> Set[str]:
+        return {word for _, word in self.matches(text)}
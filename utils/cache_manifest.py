@@ -0,0 +1,59 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+__all__ = ["read_manifest", "write_manifest", "atomic_write_text"]
+
+
+# Manifest describes what every language cache was built from:
+# {
+#     "version": 1,
+#     "languages": {
+#         "russian": {
+#             "source": "Freq2011.zip",
+#             "source_sha256": "...",
+#             "cache_count": 100000,
+#             "parser_version": 2,
+#             "files": {"nouns": "<sha256 of nouns_russian.txt>", ...}
+#         },
+#         ...
+#     }
+# }
+# It is written last and atomically, so if build crashes midway manifest
+# still describes previous inputs and the unfinished part is rebuilt next time.
+
+_MANIFEST_FILENAME = "manifest.json"
+_MANIFEST_VERSION = 1
+
+
+def atomic_write_text(filepath: Path, text: str) -> None:
+    tmp_filepath = filepath.with_name(filepath.name + ".tmp")
+    with open(tmp_filepath, "w") as fh:
+        fh.write(text)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_filepath, filepath)
+
+
+def read_manifest(cache_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns manifest entries by language name, empty if there is no
+    manifest or it was written by incompatible version
+    """
+    filepath = cache_dir.joinpath(_MANIFEST_FILENAME)
+    if not filepath.exists():
+        return {}
+    try:
+        with open(filepath, "r") as fh:
+            manifest = json.load(fh)
+    except ValueError:
+        return {}
+    if manifest.get("version") != _MANIFEST_VERSION:
+        return {}
+    return manifest.get("languages", {})
+
+
+def write_manifest(cache_dir: Path, entries: Dict[str, Dict[str, Any]]) -> None:
+    manifest = {"version": _MANIFEST_VERSION, "languages": entries}
+    atomic_write_text(cache_dir.joinpath(_MANIFEST_FILENAME), json.dumps(manifest, indent=4, ensure_ascii=False))
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlparse
+from zipfile import ZipFile, BadZipFile
+
+import requests
+
+__all__ = ["CorpusSource", "download_sources", "is_downloaded", "archive_sha256", "file_sha256", "CorruptedDownload"]
+
+
+_CHUNK_SIZE = 1 << 16
+_TIMEOUT = (10, 60)  # connect, read
+_RETRIES = 5
+
+
+class CorruptedDownload(OSError):
+    def __init__(self, filepath: Path, reason: str):
+        super().__init__(f"Downloaded file {str(filepath)} is corrupted: {reason}")
+
+
+@dataclass(frozen=True)
+class CorpusSource:
+    """
+    Archive with words frequency data. `sha256` pins expected content;
+    when it is not known in advance hash of the first complete download
+    is recorded next to archive and every later reuse is checked against it.
+    """
+    filename: str
+    url: str
+    required_member: str
+    sha256: Optional[str] = None
+
+
+def file_sha256(filepath: Path) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_filepath(filepath: Path) -> Path:
+    return filepath.with_name(filepath.name + ".sha256")
+
+
+def _is_local(location: str) -> bool:
+    return urlparse(location).scheme in ("", "file") or Path(location).exists()
+
+
+def _local_path(location: str) -> Path:
+    parsed = urlparse(location)
+    return Path(parsed.path if parsed.scheme == "file" else location)
+
+
+def _verify(source: CorpusSource, filepath: Path) -> str:
+    actual_sha256 = file_sha256(filepath)
+    if source.sha256 is not None and actual_sha256 != source.sha256:
+        raise CorruptedDownload(filepath, f"sha256 {actual_sha256} != expected {source.sha256}")
+    try:
+        with ZipFile(filepath, "r") as zf:
+            if source.required_member not in zf.namelist():
+                raise CorruptedDownload(filepath, f"no {source.required_member!r} in archive")
+            if zf.testzip() is not None:
+                raise CorruptedDownload(filepath, "CRC check failed")
+    except BadZipFile as e:
+        raise CorruptedDownload(filepath, "not a zip archive") from e
+    return actual_sha256
+
+
+def is_downloaded(source: CorpusSource, cache_dir: Path) -> bool:
+    filepath = cache_dir.joinpath(source.filename)
+    hash_filepath = _hash_filepath(filepath)
+    if not filepath.exists() or not hash_filepath.exists():
+        return False
+    recorded_sha256 = hash_filepath.read_text().strip()
+    if source.sha256 is not None and recorded_sha256 != source.sha256:
+        return False
+    return file_sha256(filepath) == recorded_sha256
+
+
+def archive_sha256(source: CorpusSource, cache_dir: Path) -> Optional[str]:
+    """
+    Hash of archive currently lying in cache_dir (None if there is none).
+    Recorded hash is trusted unless archive was replaced after recording.
+    """
+    filepath = cache_dir.joinpath(source.filename)
+    if not filepath.exists():
+        return None
+    hash_filepath = _hash_filepath(filepath)
+    if hash_filepath.exists() and filepath.stat().st_mtime_ns <= hash_filepath.stat().st_mtime_ns:
+        return hash_filepath.read_text().strip()
+    return file_sha256(filepath)
+
+
+def _expected_size(response: requests.Response, offset: int) -> Optional[int]:
+    """
+    Size of the whole file as announced by server, None if unknown
+    """
+    if response.status_code == 206:
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("Content-Length", "")
+    # compressed transfer doesn't tell size of file itself
+    if not length.isdigit() or response.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    return int(length)
+
+
+def _fetch_http(url: str, partial_filepath: Path) -> Optional[int]:
+    """
+    Downloads url into partial file, returns expected size of file (None if
+    server didn't tell it). Resumes from whatever is already in partial
+    file, so dropped connection or body ended early cost only unfinished chunk
+    """
+    expected_size = None
+    for attempt in range(_RETRIES):
+        offset = partial_filepath.stat().st_size if partial_filepath.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=_TIMEOUT) as response:
+                if response.status_code == 416:
+                    return expected_size  # nothing left to download
+                response.raise_for_status()
+                # server may ignore Range and send whole file
+                mode = "ab" if response.status_code == 206 else "wb"
+                expected_size = _expected_size(response, offset)
+                with open(partial_filepath, mode) as fh:
+                    for chunk in response.iter_content(_CHUNK_SIZE):
+                        fh.write(chunk)
+            if expected_size is None or partial_filepath.stat().st_size >= expected_size:
+                return expected_size
+            reason = "body ended early"
+        except requests.RequestException as e:
+            # client errors won't go away on retry
+            if isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code < 500:
+                raise
+            reason = "connection lost"
+        if attempt == _RETRIES - 1:
+            raise CorruptedDownload(partial_filepath, f"{reason} after {_RETRIES} attempts")
+        print(f"Download of {url}: {reason}, resuming...")
+    return expected_size
+
+
+def _download_source(source: CorpusSource, cache_dir: Path, mirror: Optional[str]) -> Path:
+    filepath = cache_dir.joinpath(source.filename)
+    if is_downloaded(source, cache_dir):
+        return filepath
+    location = source.url if mirror is None else mirror.rstrip("/") + "/" + source.filename
+    partial_filepath = filepath.with_name(filepath.name + ".part")
+    print(f"Downloading {source.filename} from {location}...")
+    expected_size = None
+    if _is_local(location):
+        shutil.copyfile(_local_path(location), partial_filepath)
+    else:
+        expected_size = _fetch_http(location, partial_filepath)
+    try:
+        sha256 = _verify(source, partial_filepath)
+    except CorruptedDownload:
+        # unfinished file is kept for the next run to resume,
+        # complete but corrupted one is downloaded anew
+        if expected_size is None or partial_filepath.stat().st_size >= expected_size:
+            partial_filepath.unlink()
+        raise
+    os.replace(partial_filepath, filepath)
+    _hash_filepath(filepath).write_text(sha256 + "\n")
+    return filepath
+
+
+def download_sources(sources: List[CorpusSource], cache_dir: Path, mirror: Optional[str] = None) -> List[Path]:
+    """
+    Downloads all sources into cache_dir at the same time. Archives already
+    present and matching recorded hash are reused. `mirror` is either base URL
+    or local directory containing archives under their original file names.
+    """
+    if not cache_dir.is_dir():
+        raise OSError(f"{str(cache_dir)} is not a dir")
+    with ThreadPoolExecutor(max_workers=len(sources) or 1) as executor:
+        futures = [executor.submit(_download_source, source, cache_dir, mirror) for source in sources]
+        return [future.result() for future in futures]
@@ -0,0 +1,78 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from tqdm import tqdm
+
+__all__ = ["LetterDag"]
+
+
+class LetterDag:
+    """
+    Words linked by removing (or, the other way round, adding) a single letter.
+    Edges are found by removing every allowed letter from every word and
+    looking the rest up in hashed set, so no alphabet is needed and total work
+    is linear in total length of words.
+    `letters` limits which letters may be removed (any by default),
+    `ends_only` allows removing only the first or the last letter.
+    Edges in both directions are kept in order of words list (most common first).
+    """
+    def __init__(self, words: Iterable[str], letters: Optional[str] = None, ends_only: bool = False):
+        self.words = list(dict.fromkeys(words))
+        self.shorter: Dict[str, List[str]] = {word: [] for word in self.words}
+        self.longer: Dict[str, List[str]] = {word: [] for word in self.words}
+        for word in tqdm(self.words, total=len(self.words), desc="Building letters graph"):
+            positions = {0, len(word) - 1} if ends_only else range(len(word))
+            for i in sorted(positions):
+                if letters is not None and word[i] not in letters:
+                    continue
+                shorter = word[:i] + word[i + 1:]
+                if shorter in self.shorter and shorter not in self.shorter[word]:
+                    self.shorter[word].append(shorter)
+                    self.longer[shorter].append(word)
+        self._longest: Dict[bool, Dict[str, int]] = {}
+
+    def _edges(self, to_shorter: bool) -> Dict[str, List[str]]:
+        return self.shorter if to_shorter else self.longer
+
+    def longest(self, to_shorter: bool) -> Dict[str, int]:
+        """
+        Memoized number of words in the longest path from every word;
+        every edge is looked at once
+        """
+        if to_shorter not in self._longest:
+            edges = self._edges(to_shorter)
+            longest = {}
+            for word in sorted(self.words, key=len, reverse=not to_shorter):
+                longest[word] = 1 + max((longest[next_word] for next_word in edges[word]), default=0)
+            self._longest[to_shorter] = longest
+        return self._longest[to_shorter]
+
+    def is_source(self, word: str, to_shorter: bool) -> bool:
+        """
+        Whether no path comes into this word
+        """
+        return not self._edges(not to_shorter)[word]
+
+    def maximal_paths(self, starts: Iterable[str], to_shorter: bool, min_words: int = 1) -> Iterator[List[str]]:
+        """
+        Yields every path from given words going as far as possible (until
+        no letter can be removed or added) consisting of at least `min_words`
+        words. Branches which can't get that long are never walked.
+        """
+        edges = self._edges(to_shorter)
+        longest = self.longest(to_shorter)
+
+        def walk(path: List[str]) -> Iterator[List[str]]:
+            next_words = edges[path[-1]]
+            if not next_words:
+                yield list(path)
+                return
+            for next_word in next_words:
+                if len(path) + longest[next_word] < min_words:
+                    continue
+                path.append(next_word)
+                yield from walk(path)
+                path.pop()
+
+        for word in starts:
+            if longest[word] >= min_words:
+                yield from walk([word])
@@ -0,0 +1,227 @@
+from collections import defaultdict
+from collections.abc import Mapping
+from itertools import chain
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Any
+
+from utils.position_index import PositionIndex
+from utils.vowel_mask_index import VowelMaskIndex
+from utils.word_trie import WordTrie
+
+__all__ = ["Lexicon", "letters_signature", "least_rotation", "reversal_key"]
+
+
+def letters_signature(word: str) -> str:
+    """
+    Letter multiset of a word as a string, equal for all anagrams of it
+    """
+    return "".join(sorted(word))
+
+
+def least_rotation(word: str) -> str:
+    """
+    Lexicographically least rotation of a word (Booth's algorithm, linear
+    in word length), equal for all words which are rotations of each other
+    """
+    doubled = word + word
+    failure = [-1] * len(doubled)
+    start = 0
+    for j in range(1, len(doubled)):
+        letter = doubled[j]
+        i = failure[j - start - 1]
+        while i != -1 and letter != doubled[start + i + 1]:
+            if letter < doubled[start + i + 1]:
+                start = j - i - 1
+            i = failure[i]
+        if letter != doubled[start + i + 1]:
+            if letter < doubled[start]:
+                start = j
+            failure[j - start] = -1
+        else:
+            failure[j - start] = i + 1
+    return doubled[start:start + len(word)]
+
+
+def reversal_key(word: str) -> str:
+    """
+    Equal for a word and the word spelled backwards
+    """
+    return min(word, word[::-1])
+
+
+class Lexicon(Mapping):
+    """
+    Words of one language by part of speech with lazily built and cached indexes.
+    Behaves as mapping "part of speech -> words", so it can be used wherever
+    plain dict of word lists was used. Every index is built for a certain
+    combination of parts of speech (all of them by default) on first request
+    and then reused by every task working with this lexicon.
+    Restricted views share index cache with the lexicon they were made from.
+    Words of every part of speech are expected to be sorted by frequency
+    (most frequent first), as they are in words cache.
+    """
+    def __init__(self,
+                 words_by_pos: Mapping[str, Sequence[str]],
+                 parts_of_speech: Optional[Iterable[str]] = None,
+                 band: Tuple[int, Optional[int]] = (0, None),
+                 _indexes: Optional[Dict[Tuple, Any]] = None):
+        self._words_by_pos = words_by_pos
+        self._parts_of_speech = tuple(words_by_pos.keys() if parts_of_speech is None else parts_of_speech)
+        self._band = band
+        self._indexes = {} if _indexes is None else _indexes
+
+    def __getitem__(self, pos: str) -> Sequence[str]:
+        if pos not in self._parts_of_speech:
+            raise KeyError(pos)
+        words = self._words_by_pos[pos]
+        if self._band == (0, None):
+            return words
+        key = ("band", pos, self._band)
+        if key not in self._indexes:
+            self._indexes[key] = words[self._band[0]:self._band[1]]
+        return self._indexes[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._parts_of_speech)
+
+    def __len__(self) -> int:
+        return len(self._parts_of_speech)
+
+    def restricted(self, parts_of_speech: Iterable[str]) -> "Lexicon":
+        parts_of_speech = tuple(parts_of_speech)
+        for pos in parts_of_speech:
+            if pos not in self._words_by_pos:
+                raise KeyError(pos)
+        return Lexicon(self._words_by_pos, parts_of_speech, self._band, self._indexes)
+
+    def rank_band(self, start: int = 0, stop: Optional[int] = None) -> "Lexicon":
+        """
+        View containing only words with frequency rank (position in its part
+        of speech) in [start, stop), e.g. rank_band(0, 5000) for well-known
+        words or rank_band(1000, 5000) to skip the most trivial ones
+        """
+        return Lexicon(self._words_by_pos, self._parts_of_speech, (start, stop), self._indexes)
+
+    def _cached(self, name: str, parts_of_speech: Optional[Iterable[str]], build: Callable[[List[str]], Any]):
+        parts_of_speech = self._parts_of_speech if parts_of_speech is None else tuple(parts_of_speech)
+        key = (name, parts_of_speech, self._band)
+        if key not in self._indexes:
+            words_key = ("words", parts_of_speech, self._band)
+            words = self._indexes.get(words_key)
+            if words is None:
+                words = list(chain.from_iterable(self[pos] for pos in parts_of_speech))
+                self._indexes[words_key] = words
+            self._indexes[key] = build(words)
+        return self._indexes[key]
+
+    def frequency(self, word: str, parts_of_speech: Optional[Iterable[str]] = None) -> float:
+        """
+        Corpus frequency of word (the highest one if word belongs to several
+        of given parts of speech), 0 for unknown words.
+        Frequency inside single part of speech never increases along its words list.
+        """
+        parts_of_speech = self._parts_of_speech if parts_of_speech is None else tuple(parts_of_speech)
+        key = ("frequency", parts_of_speech)
+        if key not in self._indexes:
+            self._indexes[key] = _build_frequencies({pos: self._words_by_pos[pos] for pos in parts_of_speech})
+        return self._indexes[key].get(word, 0.0)
+
+    def commonness(self, words: Iterable[str], parts_of_speech: Optional[Iterable[str]] = None) -> float:
+        """
+        Group of words is as common as its rarest word
+        """
+        return min((self.frequency(word, parts_of_speech) for word in words), default=0.0)
+
+    def words(self, parts_of_speech: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Words of given parts of speech in cache order (duplicates are kept)
+        """
+        return self._cached("words", parts_of_speech, lambda words: words)
+
+    def word_set(self, parts_of_speech: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+        return self._cached("set", parts_of_speech, frozenset)
+
+    def by_length(self, parts_of_speech: Optional[Iterable[str]] = None) -> Dict[int, List[str]]:
+        return self._cached("length", parts_of_speech, lambda words: _bucket(words, len))
+
+    def by_first_letter(self, parts_of_speech: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        return self._cached("first", parts_of_speech, lambda words: _bucket(words, lambda w: w[:1]))
+
+    def by_last_letter(self, parts_of_speech: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        return self._cached("last", parts_of_speech, lambda words: _bucket(words, lambda w: w[-1:]))
+
+    def by_first_last_letters(self,
+                              parts_of_speech: Optional[Iterable[str]] = None) -> Dict[Tuple[str, str], List[str]]:
+        return self._cached("first_last", parts_of_speech, lambda words: _bucket(words, lambda w: (w[:1], w[-1:])))
+
+    def sorted_words(self, parts_of_speech: Optional[Iterable[str]] = None) -> List[str]:
+        return self._cached("sorted", parts_of_speech, sorted)
+
+    def sorted_reversed(self, parts_of_speech: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Words sorted by their reversed spelling, i.e. words with common
+        endings are adjacent
+        """
+        return self._cached("sorted_reversed", parts_of_speech, lambda words: sorted(words, key=lambda w: w[::-1]))
+
+    def by_rotation(self, parts_of_speech: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        Words grouped by cyclic rotation, see `least_rotation`
+        """
+        return self._cached("rotation", parts_of_speech, lambda words: _bucket(words, least_rotation))
+
+    def by_reversal(self, parts_of_speech: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        Words grouped with their reversals, see `reversal_key`
+        """
+        return self._cached("reversal", parts_of_speech, lambda words: _bucket(words, reversal_key))
+
+    def prefix_trie(self, parts_of_speech: Optional[Iterable[str]] = None) -> WordTrie:
+        return self._cached("prefix_trie", parts_of_speech, lambda words: WordTrie(self.sorted_words(parts_of_speech)))
+
+    def suffix_trie(self, parts_of_speech: Optional[Iterable[str]] = None) -> WordTrie:
+        """
+        Trie over reversed words, its prefixes are reversed suffixes
+        """
+        return self._cached("suffix_trie", parts_of_speech,
+                            lambda words: WordTrie(self.sorted_reversed(parts_of_speech), key=lambda w: w[::-1]))
+
+    def by_signature(self, parts_of_speech: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        Words grouped by letter multiset, see `letters_signature`
+        """
+        return self._cached("signature", parts_of_speech, lambda words: _bucket(words, letters_signature))
+
+    def vowel_masks(self, parts_of_speech: Optional[Iterable[str]] = None) -> VowelMaskIndex:
+        """
+        Words by (length, positions of vowels), see `VowelMaskIndex`
+        """
+        return self._cached("vowel_masks", parts_of_speech, VowelMaskIndex)
+
+    def position_index(self, parts_of_speech: Optional[Iterable[str]] = None) -> PositionIndex:
+        """
+        Words by (length, position, letter), see `PositionIndex`
+        """
+        parts_of_speech = None if parts_of_speech is None else tuple(parts_of_speech)
+        return self._cached("position", parts_of_speech,
+                            lambda words: PositionIndex(words, lambda word: self.frequency(word, parts_of_speech)))
+
+
+def _build_frequencies(words_by_pos: Mapping[str, Sequence[str]]) -> Dict[str, float]:
+    result = {}
+    for words in words_by_pos.values():
+        if hasattr(words, "frequencies"):
+            frequencies = words.frequencies()
+        else:
+            # Plain lists carry only order; Zipf's law is good enough estimate then
+            frequencies = [1.0 / rank for rank in range(1, len(words) + 1)]
+        for word, frequency in zip(words, frequencies):
+            if frequency > result.get(word, -1.0):
+                result[word] = frequency
+    return result
+
+
+def _bucket(words: Iterable[str], key: Callable[[str], Any]) -> Dict[Any, List[str]]:
+    result = defaultdict(list)
+    for word in words:
+        result[key(word)].append(word)
+    return dict(result)
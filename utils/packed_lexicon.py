@@ -0,0 +1,202 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, List, Union, Iterator, Optional
+
+__all__ = ["PackedLexicon", "PackedWordList", "compile_lexicon", "is_lexicon_stale"]
+
+
+# Compiled lexicon of a single language. Layout (all numbers are little-endian):
+#   header:     magic, format version, parts of speech count, words count
+#   pos table:  for every part of speech - name, index of first word, words count
+#   offsets:    uint32[words count + 1] - byte offsets of words in blob
+#   pos tags:   uint8[words count] - index of word's part of speech in pos table
+#   ranks:      uint32[words count] - frequency rank of word inside its part of speech
+#   freqs:      float32[words count] - frequency of word in corpus (0 if unknown)
+#   blob:       UTF-8 words, every one followed by "\n"
+# Sections are padded to 4 bytes so they can be viewed in place without copying.
+# Words of the same part of speech are stored contiguously in frequency order,
+# so whole part of speech (or any slice of it) is decoded by a single split.
+
+_MAGIC = b"PZLX"
+_FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sIII")
+_POS_ENTRY = struct.Struct("<16sII")
+
+
+def _pad4(size: int) -> int:
+    return (size + 3) & ~3
+
+
+def _array_view(buffer, typecode: str, start: int, count: int):
+    view = memoryview(buffer)[start:start + 4 * count]
+    if sys.byteorder == "little":
+        return view.cast(typecode)
+    swapped = array(typecode, view.tobytes())
+    swapped.byteswap()
+    return swapped
+
+
+def compile_lexicon(words_by_pos: Dict[str, List[str]],
+                    filepath: Path,
+                    frequencies_by_pos: Optional[Dict[str, List[float]]] = None) -> None:
+    """
+    Writes words grouped by part of speech (each group sorted by frequency)
+    into compiled lexicon file. File is replaced atomically.
+    """
+    pos_names = list(words_by_pos.keys())
+    total = sum(len(words) for words in words_by_pos.values())
+    offsets, pos_tags, ranks, freqs = array("I", [0]), bytearray(), array("I"), array("f")
+    blob = bytearray()
+    pos_table = []
+    for pos_idx, pos in enumerate(pos_names):
+        words = words_by_pos[pos]
+        pos_table.append(_POS_ENTRY.pack(pos.encode("utf-8"), len(pos_tags), len(words)))
+        for rank, word in enumerate(words):
+            blob += word.encode("utf-8")
+            blob += b"\n"
+            offsets.append(len(blob))
+            pos_tags.append(pos_idx)
+            ranks.append(rank)
+        if frequencies_by_pos is not None:
+            freqs.extend(frequencies_by_pos[pos])
+        else:
+            freqs.extend([0.0] * len(words))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        ranks.byteswap()
+        freqs.byteswap()
+    pos_tags += b"\0" * (_pad4(len(pos_tags)) - len(pos_tags))
+
+    tmp_filepath = filepath.with_name(filepath.name + ".tmp")
+    with open(tmp_filepath, "wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(pos_names), total))
+        for entry in pos_table:
+            fh.write(entry)
+        fh.write(offsets.tobytes())
+        fh.write(pos_tags)
+        fh.write(ranks.tobytes())
+        fh.write(freqs.tobytes())
+        fh.write(blob)
+    os.replace(tmp_filepath, filepath)
+
+
+def is_lexicon_stale(filepath: Path, source_filepaths: List[Path]) -> bool:
+    """
+    Compiled lexicon should be rebuilt if it is missing, was written by another
+    format version or any of editable source files was modified after it.
+    """
+    if not filepath.exists():
+        return True
+    with open(filepath, "rb") as fh:
+        header = fh.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return True
+    magic, version, _, _ = _HEADER.unpack(header)
+    if magic != _MAGIC or version != _FORMAT_VERSION:
+        return True
+    compiled_mtime = filepath.stat().st_mtime_ns
+    return any(p.stat().st_mtime_ns > compiled_mtime for p in source_filepaths)
+
+
+class PackedLexicon:
+    """
+    Read-only view of compiled lexicon file. Nothing is parsed on opening:
+    offsets, ranks and frequencies are viewed directly in mapped memory, words are decoded
+    only when they are accessed.
+    """
+    def __init__(self, filepath: Path):
+        with open(filepath, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, pos_count, total = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"{str(filepath)} is not a compiled lexicon of version {_FORMAT_VERSION}")
+        self.total = total
+        self.parts_of_speech: Dict[str, range] = {}
+        cursor = _HEADER.size
+        for _ in range(pos_count):
+            name, start, count = _POS_ENTRY.unpack_from(self._mmap, cursor)
+            self.parts_of_speech[name.rstrip(b"\0").decode("utf-8")] = range(start, start + count)
+            cursor += _POS_ENTRY.size
+        self._offsets = _array_view(self._mmap, "I", cursor, total + 1)
+        cursor += 4 * (total + 1)
+        self.pos_tags = memoryview(self._mmap)[cursor:cursor + total]
+        cursor += _pad4(total)
+        self.ranks = _array_view(self._mmap, "I", cursor, total)
+        cursor += 4 * total
+        self.frequencies = _array_view(self._mmap, "f", cursor, total)
+        cursor += 4 * total
+        self._blob_start = cursor
+
+    def word(self, idx: int) -> str:
+        start, end = self._blob_start + self._offsets[idx], self._blob_start + self._offsets[idx + 1] - 1
+        return self._mmap[start:end].decode("utf-8")
+
+    def words(self, start: int, stop: int) -> List[str]:
+        if start >= stop:
+            return []
+        begin, end = self._blob_start + self._offsets[start], self._blob_start + self._offsets[stop] - 1
+        return self._mmap[begin:end].decode("utf-8").split("\n")
+
+    def words_by_pos(self) -> Dict[str, "PackedWordList"]:
+        return {pos: PackedWordList(self, indices.start, len(indices))
+                for pos, indices in self.parts_of_speech.items()}
+
+
+class PackedWordList(Sequence):
+    """
+    List-like sequence of words of one part of speech in compiled lexicon.
+    Indexing decodes single word, slicing decodes only requested range,
+    iterating decodes the whole part of speech once and keeps the result.
+    Concatenation and slicing produce plain lists, so it can be used
+    wherever list of words was used.
+    """
+    def __init__(self, lexicon: PackedLexicon, start: int, count: int):
+        self._lexicon = lexicon
+        self._start = start
+        self._count = count
+        self._materialized = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[str, List[str]]:
+        if self._materialized is not None:
+            return self._materialized[idx]
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self._count)
+            if step != 1:
+                return self._words()[idx]
+            return self._lexicon.words(self._start + start, self._start + max(start, stop))
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("word index out of range")
+        return self._lexicon.word(self._start + idx)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._words())
+
+    def __add__(self, other) -> List[str]:
+        return self._words() + list(other)
+
+    def __radd__(self, other) -> List[str]:
+        return list(other) + self._words()
+
+    def __repr__(self) -> str:
+        return f"PackedWordList(count={self._count})"
+
+    def rank(self, idx: int) -> int:
+        return self._lexicon.ranks[self._start + idx]
+
+    def frequencies(self) -> List[float]:
+        return self._lexicon.frequencies[self._start:self._start + self._count].tolist()
+
+    def _words(self) -> List[str]:
+        if self._materialized is None:
+            self._materialized = self._lexicon.words(self._start, self._start + self._count)
+        return self._materialized
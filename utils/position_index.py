@@ -0,0 +1,47 @@
+import random
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+__all__ = ["PositionIndex"]
+
+
+class PositionIndex:
+    """
+    Words by (length, position, letter), the most common first, with
+    cumulative frequencies for weighted sampling. Buckets of every
+    (length, position) are built once on first request.
+    """
+    def __init__(self, words: Iterable[str], frequency: Callable[[str], float]):
+        self.frequency = frequency
+        self._by_length: Dict[int, List[str]] = {}
+        for word in words:
+            self._by_length.setdefault(len(word), []).append(word)
+        self._buckets: Dict[Tuple[int, int], Dict[str, Tuple[List[str], List[float]]]] = {}
+
+    def _bucket(self, length: int, position: int, letter: str) -> Tuple[List[str], List[float]]:
+        position %= length
+        if (length, position) not in self._buckets:
+            words_by_letter: Dict[str, List[str]] = {}
+            for word in self._by_length.get(length, []):
+                words_by_letter.setdefault(word[position], []).append(word)
+            buckets = {}
+            for bucket_letter, words in words_by_letter.items():
+                words = sorted(set(words), key=lambda word: (-self.frequency(word), word))
+                buckets[bucket_letter] = (words, list(accumulate(map(self.frequency, words))))
+            self._buckets[(length, position)] = buckets
+        return self._buckets[(length, position)].get(letter, ([], []))
+
+    def words(self, length: int, position: int, letter: str) -> List[str]:
+        return self._bucket(length, position, letter)[0]
+
+    def sample(self, length: int, position: int, letter: str, rng: random.Random) -> Optional[str]:
+        """
+        Random word, the more common the more likely
+        """
+        words, cum_weights = self._bucket(length, position, letter)
+        if not words:
+            return None
+        if not cum_weights[-1]:
+            return rng.choice(words)
+        return words[min(bisect_left(cum_weights, rng.random() * cum_weights[-1]), len(words) - 1)]
@@ -0,0 +1,76 @@
+import heapq
+from typing import Any, Iterable, List, Optional, Sequence
+
+from utils.lexicon import Lexicon
+
+__all__ = ["TopK", "top_by_commonness", "remaining_best"]
+
+
+class TopK:
+    """
+    Keeps `k` items with the highest score in bounded min-heap, among items
+    with equal score the earlier pushed ones are kept.
+    With `k=None` keeps every item in order of pushing, so finders can
+    use it unconditionally and output stays the same when no limit is set.
+    """
+    def __init__(self, k: Optional[int] = None):
+        self.k = k
+        self._heap = []
+        self._all = []
+        self._pushed = 0
+
+    def push(self, score: float, item: Any) -> None:
+        if self.k is None:
+            self._all.append(item)
+            return
+        if self.k <= 0:
+            return
+        entry = (score, -self._pushed, item)
+        self._pushed += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def can_improve(self, score_upper_bound: float) -> bool:
+        """
+        Whether item with score not higher than given bound can still get in.
+        Finders iterating candidates from the most common ones stop as soon
+        as this turns False.
+        """
+        if self.k is None:
+            return True
+        if self.k <= 0:
+            return False
+        return len(self._heap) < self.k or score_upper_bound > self._heap[0][0]
+
+    def items(self) -> List[Any]:
+        if self.k is None:
+            return list(self._all)
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+def top_by_commonness(lexicon: Lexicon, groups: Iterable[Iterable[str]], k: Optional[int] = None) -> List[Any]:
+    """
+    Ranks groups of words (chains, clusters, squares...) by commonness of
+    their rarest word and keeps `k` best of them. Groups are consumed lazily,
+    so generator of groups is never held in memory as a whole.
+    """
+    ranked = TopK(k)
+    for group in groups:
+        ranked.push(lexicon.commonness(group), group)
+    return ranked.items()
+
+
+def remaining_best(scores: Sequence[float]) -> List[float]:
+    """
+    i-th value is the highest score from i-th on. Finders stop on it rather
+    than on score of current item: words are mostly ordered by frequency, but
+    manually added words (frequency 0) may stand anywhere in the list.
+    """
+    result = [0.0] * len(scores)
+    best = float("-inf")
+    for i in range(len(scores) - 1, -1, -1):
+        best = max(best, scores[i])
+        result[i] = best
+    return result
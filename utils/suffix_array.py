@@ -0,0 +1,69 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from utils.word_trie import WordTrie
+
+__all__ = ["SuffixArray"]
+
+
+_MAX_CHAR = chr(0x10FFFF)
+
+
+class SuffixArray:
+    """
+    Sorted suffixes of every word of a list. Suffix of a word never runs
+    into the next word, so suffixes are short and sorting them is cheap.
+    All occurrences of a pattern are a contiguous range found by binary search.
+    Example:
+    >>> index = SuffixArray(["королевство", "перевозка"])
+    >>> sorted(index.occurrences("ев"))
+    [(0, 5), (1, 3)]
+    >>> [(w, gap) for w, _, gap in index.gapped("ре", WordTrie(["воз", "груз"]), "ка")]
+    [(1, 'воз')]
+    """
+    def __init__(self, words: Sequence[str]):
+        self.words = words
+        suffixes = sorted((word[offset:], word_idx, offset)
+                          for word_idx, word in enumerate(words)
+                          for offset in range(len(word)))
+        self._suffixes: List[str] = [suffix for suffix, _, _ in suffixes]
+        self._word_idx = array("I", (word_idx for _, word_idx, _ in suffixes))
+        self._offset = array("I", (offset for _, _, offset in suffixes))
+
+    def _range(self, pattern: str) -> Tuple[int, int]:
+        return bisect_left(self._suffixes, pattern), bisect_right(self._suffixes, pattern + _MAX_CHAR)
+
+    def count(self, pattern: str) -> int:
+        lo, hi = self._range(pattern)
+        return hi - lo
+
+    def occurrences(self, pattern: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yields (word index, offset in word) for every occurrence of pattern
+        """
+        lo, hi = self._range(pattern)
+        for i in range(lo, hi):
+            yield self._word_idx[i], self._offset[i]
+
+    def gapped(self, first: str, gap_words: WordTrie, second: Optional[str] = None) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yields (word index, offset of `first`, gap word) for every occurrence of
+        first + X + second where X is any of gap words. Occurrences of `first`
+        are found by binary search, gap words by walking their trie along
+        the rest of the word, `second` is then just compared.
+        Without `second` every first + X is reported, so caller may check
+        what follows itself.
+        """
+        for word_idx, offset in self.occurrences(first):
+            word = self.words[word_idx]
+            gap_start = offset + len(first)
+            node = 0
+            for position in range(gap_start, len(word)):
+                node = gap_words.children(node).get(word[position])
+                if node is None:
+                    break
+                if gap_words.is_word(node):
+                    gap_end = position + 1
+                    if second is None or word.startswith(second, gap_end):
+                        yield word_idx, offset, word[gap_start:gap_end]
@@ -0,0 +1,59 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from utils.word_validation import is_russian_vowel
+
+__all__ = ["VowelMaskIndex", "vowel_mask", "line_mask"]
+
+
+def vowel_mask(word: str) -> int:
+    """
+    Bit i is set if i-th letter is a vowel
+    """
+    return sum(1 << i for i, char in enumerate(word) if is_russian_vowel(char))
+
+
+def line_mask(line: str) -> int:
+    """
+    Bit i is set if i-th pixel is black
+    """
+    return sum(1 << i for i, pixel in enumerate(line) if pixel == "B")
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+class VowelMaskIndex:
+    """
+    Words bucketed by (length, vowel mask), words of bucket keep lexicon
+    order (the most common first). Build it once to encode many images.
+    """
+    def __init__(self, words: Iterable[str]):
+        self.buckets: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+        # length -> masks present in that length
+        self.masks: Dict[int, List[int]] = defaultdict(list)
+        self.positions: Dict[str, int] = {}
+        for word in words:
+            self.positions.setdefault(word, len(self.positions))
+            key = (len(word), vowel_mask(word))
+            if key not in self.buckets:
+                self.masks[len(word)].append(key[1])
+            self.buckets[key].append(word)
+
+    def exact(self, line: str) -> List[str]:
+        return self.buckets.get((len(line), line_mask(line)), [])
+
+    def nearest(self, line: str, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        (distance, word) for words of the same length whose vowels differ
+        from black pixels of line in at most `max_distance` letters,
+        the closest and then the most common first
+        """
+        mask = line_mask(line)
+        found = []
+        for other in self.masks.get(len(line), []):
+            distance = _popcount(mask ^ other)
+            if distance <= max_distance:
+                found += [(distance, word) for word in self.buckets[(len(line), other)]]
+        return sorted(found, key=lambda item: (item[0], self.positions[item[1]]))
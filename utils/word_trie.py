@@ -0,0 +1,100 @@
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Callable
+
+__all__ = ["WordTrie"]
+
+
+class WordTrie:
+    """
+    Trie over sorted list of words. Words passing through any node are
+    contiguous in that list, so node keeps only a range of them and every
+    group of words sharing a prefix is a slice, found without walking subtree.
+    With `key` trie is built over transformed words (e.g. reversed ones
+    for suffixes), words should be sorted by that key then.
+    """
+    def __init__(self, sorted_words: Sequence[str], key: Optional[Callable[[str], str]] = None):
+        self.words = sorted_words
+        self._key = key
+        self._lo = array("I", [0])
+        self._hi = array("I", [len(sorted_words)])
+        self._depth = array("I", [0])
+        self._children: List[Dict[str, int]] = [{}]
+
+        path = [0]
+        previous = ""
+        for i, word in enumerate(sorted_words):
+            word = key(word) if key else word
+            common = 0
+            for a, b in zip(previous, word):
+                if a != b:
+                    break
+                common += 1
+            while len(path) - 1 > common:
+                self._hi[path.pop()] = i
+            for depth in range(common + 1, len(word) + 1):
+                node = len(self._lo)
+                self._lo.append(i)
+                self._hi.append(i)
+                self._depth.append(depth)
+                self._children.append({})
+                self._children[path[-1]][word[depth - 1]] = node
+                path.append(node)
+            previous = word
+        while len(path) > 1:
+            self._hi[path.pop()] = len(sorted_words)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def find(self, prefix: str) -> Optional[int]:
+        """
+        Node of given prefix (in key space) or None
+        """
+        node = 0
+        for letter in prefix:
+            node = self._children[node].get(letter)
+            if node is None:
+                return None
+        return node
+
+    def children(self, node: int) -> Dict[str, int]:
+        return self._children[node]
+
+    def count(self, node: int) -> int:
+        return self._hi[node] - self._lo[node]
+
+    def is_word(self, node: int) -> bool:
+        """
+        Whether prefix of node is itself one of the words
+        """
+        lo = self._lo[node]
+        if lo == self._hi[node]:
+            return False
+        word = self.words[lo]
+        return len(self._key(word) if self._key else word) == self._depth[node]
+
+    def prefix(self, node: int) -> str:
+        word = self.words[self._lo[node]]
+        return (self._key(word) if self._key else word)[:self._depth[node]]
+
+    def words_with_prefix(self, prefix: str) -> List[str]:
+        node = self.find(prefix)
+        return [] if node is None else list(self.words[self._lo[node]:self._hi[node]])
+
+    def clusters(self,
+                 min_depth: int,
+                 max_depth: int,
+                 min_size: int,
+                 is_part_eligible: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[int, List[str]]]:
+        """
+        Single pass over nodes in sorted order, yields (depth, words) for every
+        node with depth in [min_depth, max_depth] having at least `min_size` words.
+        `is_part_eligible` additionally filters nodes by their prefix.
+        """
+        for node in range(1, len(self._lo)):
+            depth = self._depth[node]
+            if depth < min_depth or depth > max_depth or self.count(node) < min_size:
+                continue
+            if is_part_eligible is not None and not is_part_eligible(self.prefix(node)):
+                continue
+            yield depth, list(self.words[self._lo[node]:self._hi[node]])
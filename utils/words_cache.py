@@ -1,9 +1,14 @@
-from enum import Enum
+import heapq
+import io
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict
-import requests
+from typing import List, Dict, Iterator, Iterable, Optional, Tuple
 from zipfile import ZipFile
+from utils.cache_manifest import read_manifest, write_manifest, atomic_write_text
+from utils.download import CorpusSource, download_sources, archive_sha256, file_sha256
 from utils.language import get_known_parts_of_speech, Language
+from utils.lexicon import Lexicon
+from utils.packed_lexicon import PackedLexicon, compile_lexicon, is_lexicon_stale
 
 
 # freqrnc2011.csv:
@@ -22,124 +27,265 @@ def _get_cache_filepaths_english(cache_dir: Path):
             get_known_parts_of_speech()}
 
 
-def _write_cache(cache_filepahs_by_pos, words_by_pos):
-    for pos, words in words_by_pos.items():
-        filepath = cache_filepahs_by_pos[pos]
-        with open(filepath, "w") as f:
-            f.write("\n".join(words))
+def _get_lexicon_filepath(cache_dir: Path, language: Language):
+    return cache_dir.joinpath(f"lexicon_{language.value}.bin")
+
 
+# Cache .txt files contain one word per line followed by its corpus frequency
+# separated by tab. Frequency may be omitted for manually added words,
+# such words are considered the rarest ones
 
-def _download_freq2011(cache_dir: Path):
-    if not cache_dir.is_dir():
-        raise OSError(f"{str(cache_dir)} is not a dir")
-    zip_filepath = cache_dir.joinpath("Freq2011.zip")
-    print("Downloading RU data...")
-    request = requests.get("http://dict.ruslang.ru/Freq2011.zip")
-    with open(zip_filepath, "wb") as fh:
-        fh.write(request.content)
-    print("Extracting archive...")
-    with ZipFile(zip_filepath, 'r') as fh:
-        fh.extract("freqrnc2011.csv", cache_dir)
 
+# Bump when preprocessing changes its output, caches built by previous
+# versions are rebuilt then
+_PARSER_VERSION = 2
 
-def _preprocess_freq2011(cache_dir: Path, count=100000):
+
+def _write_cache(cache_filepahs_by_pos, words_by_pos: Dict[str, List[Tuple[str, float]]]):
+    for pos, words in words_by_pos.items():
+        atomic_write_text(cache_filepahs_by_pos[pos], "\n".join(f"{word}\t{freq:g}" for word, freq in words))
+
+
+# Upstream doesn't publish checksums, so hashes are pinned only after the first
+# download (see CorpusSource)
+_FREQ2011 = CorpusSource(
+    filename="Freq2011.zip",
+    url="http://dict.ruslang.ru/Freq2011.zip",
+    required_member="freqrnc2011.csv")
+_SUBTLEX_US = CorpusSource(
+    filename="SUBTLEX-US_frequency_list_with_PoS_information_final_text_version.zip",
+    url="http://crr.ugent.be/papers/SUBTLEX-US_frequency_list_with_PoS_information_final_text_version.zip",
+    required_member="SUBTLEX-US frequency list with PoS information text version.txt")
+
+
+class _TopWordsByPos:
+    """
+    Keeps only `count` most frequent words for every part of speech
+    using bounded min-heaps, so memory doesn't depend on corpus size.
+    Among words with equal frequency the ones seen earlier are kept,
+    same as stable sort by frequency would do.
+    """
+    def __init__(self, count: int):
+        self.count = count
+        self.heaps = {pos: [] for pos in get_known_parts_of_speech()}
+        self.seen = 0
+
+    def push(self, pos: str, lemma: str, freq: float):
+        heap = self.heaps[pos]
+        item = (freq, -self.seen, lemma)
+        self.seen += 1
+        if len(heap) < self.count:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def words_by_pos(self, parts_of_speech: Optional[List[str]] = None) -> Dict[str, List[Tuple[str, float]]]:
+        return {pos: [(lemma, freq) for freq, _, lemma in sorted(heap, reverse=True)]
+                for pos, heap in self.heaps.items()
+                if parts_of_speech is None or pos in parts_of_speech}
+
+
+def _iterate_zip_member_lines(zip_filepath: Path, member: str) -> Iterator[str]:
+    with ZipFile(zip_filepath, "r") as zf:
+        with zf.open(member) as raw:
+            yield from io.TextIOWrapper(raw)
+
+
+def _preprocess_freq2011(cache_dir: Path, count=100000, parts_of_speech: Optional[List[str]] = None):
     print(f"Preparing RU words cache count={count}...")
-    csv_filepath = cache_dir.joinpath("freqrnc2011.csv")
-
-    words_by_pos = {pos: [] for pos in get_known_parts_of_speech()}
-    with open(csv_filepath, "r") as fh:
-        first = True
-        for line in fh:
-            if first:
-                first = False
-                continue
-            lemma, pos, freq, _, _, _ = line.split()
-            if pos == "s":
-                words_by_pos["nouns"].append((lemma, float(freq)))
-            elif pos == "v":
-                words_by_pos["verbs"].append((lemma, float(freq)))
-            elif pos == "a":
-                words_by_pos["adjectives"].append((lemma, float(freq)))
-
-    def sort_by_ipm_then_discard_ipm(words: List[Tuple[str, float]]) -> List[str]:
-        return [tup[0] for tup in sorted(words, key=lambda tup: -tup[1])[:count]]
-
-    words_by_pos = {pos: sort_by_ipm_then_discard_ipm(words)
-                    for pos, words in words_by_pos.items()}
+    pos_names = {"s": "nouns", "v": "verbs", "a": "adjectives"}
+    top_words = _TopWordsByPos(count)
+    lines = _iterate_zip_member_lines(cache_dir.joinpath(_FREQ2011.filename), _FREQ2011.required_member)
+    next(lines, None)  # header
+    for line in lines:
+        lemma, pos, freq, _, _, _ = line.split()
+        if pos in pos_names:
+            top_words.push(pos_names[pos], lemma, float(freq))
 
     cache_filepahs_by_pos = _get_cache_filepaths_russian(cache_dir)
-    _write_cache(cache_filepahs_by_pos, words_by_pos)
+    _write_cache(cache_filepahs_by_pos, top_words.words_by_pos(parts_of_speech))
 
 
 # The Center for Reading Research vocabulary
 # http://crr.ugent.be
 
 
-def _download_crrugent_subtlex_us(cache_dir: Path):
-    if not cache_dir.is_dir():
-        raise OSError(f"{str(cache_dir)} is not a dir")
-    zip_filepath = cache_dir.joinpath("SUBTLEX-US_frequency_list_with_PoS_information_final_text_version.zip")
-    print("Downloading EN data...")
-    request = requests.get(
-        "http://crr.ugent.be/papers/SUBTLEX-US_frequency_list_with_PoS_information_final_text_version.zip")
-    with open(zip_filepath, "wb") as fh:
-        fh.write(request.content)
-    print("Extracting archive...")
-    with ZipFile(zip_filepath, 'r') as fh:
-        fh.extract("SUBTLEX-US frequency list with PoS information text version.txt", cache_dir)
-
-
-def _preprocess_crrugent_subtlex_us(cache_dir: Path, count=100000):
+def _preprocess_crrugent_subtlex_us(cache_dir: Path, count=100000, parts_of_speech: Optional[List[str]] = None):
     print(f"Preparing EN words cache count={count}...")
-    csv_filepath = cache_dir.joinpath("SUBTLEX-US frequency list with PoS information text version.txt")
-
-    words_by_pos = {pos: [] for pos in get_known_parts_of_speech()}
-    with open(csv_filepath, "r") as fh:
-        first = True
-        for line in fh:
-            if first:
-                first = False
-                continue
-            splitted = line.split()
-            lemma, pos, freq = splitted[0], splitted[9], splitted[1]
-            if pos == "Noun":
-                words_by_pos["nouns"].append((lemma, float(freq)))
-            elif pos == "Verb":
-                words_by_pos["verbs"].append((lemma, float(freq)))
-            elif pos == "Adjective":
-                words_by_pos["adjectives"].append((lemma, float(freq)))
-
-    def sort_by_freq_then_discard_freq(words: List[Tuple[str, float]]) -> List[str]:
-        return [tup[0] for tup in sorted(words, key=lambda tup: -tup[1])[:count]]
-
-    words_by_pos = {pos: sort_by_freq_then_discard_freq(words)
-                    for pos, words in words_by_pos.items()}
+    pos_names = {"Noun": "nouns", "Verb": "verbs", "Adjective": "adjectives"}
+    top_words = _TopWordsByPos(count)
+    lines = _iterate_zip_member_lines(cache_dir.joinpath(_SUBTLEX_US.filename), _SUBTLEX_US.required_member)
+    next(lines, None)  # header
+    for line in lines:
+        splitted = line.split()
+        lemma, pos, freq = splitted[0], splitted[9], splitted[1]
+        if pos in pos_names:
+            top_words.push(pos_names[pos], lemma, float(freq))
 
     cache_filepahs_by_pos = _get_cache_filepaths_english(cache_dir)
-    _write_cache(cache_filepahs_by_pos, words_by_pos)
-
-
-def is_cache_ready(cache_dir: Path) -> bool:
-    return all([p.exists() for p in _get_cache_filepaths_russian(cache_dir).values()]) and \
-           all([p.exists() for p in _get_cache_filepaths_english(cache_dir).values()])
-
-
-def build_cache(cache_dir, cache_count=100000) -> None:
-    _download_freq2011(cache_dir)
-    _preprocess_freq2011(cache_dir, cache_count)
-    _download_crrugent_subtlex_us(cache_dir)
-    _preprocess_crrugent_subtlex_us(cache_dir, cache_count)
-
-
-def load_caches(cache_dir) -> Dict[Enum, Dict[str, List[str]]]:
-    def load_single_cache(pos_filepaths: Dict[str, Path]):
-        result = {}
-        for part_of_speech, filepath in pos_filepaths.items():
-            with open(filepath, "r") as fh:
-                result[part_of_speech] = [word.strip() for word in list(fh)]
-        return result
-
-    return {
-        Language.RUSSIAN: load_single_cache(_get_cache_filepaths_russian(cache_dir)),
-        Language.ENGLISH: load_single_cache(_get_cache_filepaths_english(cache_dir))
-    }
+    _write_cache(cache_filepahs_by_pos, top_words.words_by_pos(parts_of_speech))
+
+
+def _get_cache_filepaths(cache_dir: Path, language: Language):
+    if language is Language.RUSSIAN:
+        return _get_cache_filepaths_russian(cache_dir)
+    if language is Language.ENGLISH:
+        return _get_cache_filepaths_english(cache_dir)
+    raise ValueError(f"There is no words cache for language {language.value!r}")
+
+
+_SOURCES = {
+    Language.RUSSIAN: (_FREQ2011, _preprocess_freq2011),
+    Language.ENGLISH: (_SUBTLEX_US, _preprocess_crrugent_subtlex_us),
+}
+
+
+def _parts_to_rebuild(cache_dir: Path, language: Language, cache_count: int, manifest) -> List[str]:
+    # Everything is rebuilt if any input changed, otherwise only missing files
+    filepaths = _get_cache_filepaths(cache_dir, language)
+    entry = manifest.get(language.value)
+    source, _ = _SOURCES[language]
+    source_sha256 = archive_sha256(source, cache_dir)
+    if entry is None \
+            or entry["cache_count"] != cache_count \
+            or entry["parser_version"] != _PARSER_VERSION \
+            or (source_sha256 is not None and source_sha256 != entry["source_sha256"]):
+        return list(filepaths.keys())
+    return [pos for pos, filepath in filepaths.items() if not filepath.exists()]
+
+
+def is_cache_ready(cache_dir: Path,
+                   languages: Iterable[Language] = (Language.RUSSIAN, Language.ENGLISH),
+                   cache_count: int = 100000) -> bool:
+    manifest = read_manifest(cache_dir)
+    return not any(_parts_to_rebuild(cache_dir, language, cache_count, manifest) for language in languages)
+
+
+def build_cache(cache_dir,
+                cache_count=100000,
+                mirror: Optional[str] = None,
+                languages: Iterable[Language] = (Language.RUSSIAN, Language.ENGLISH)) -> None:
+    """
+    Rebuilds only languages and parts of speech which are missing or whose
+    inputs (source archive, cache_count, parser version) changed according to
+    manifest. Already downloaded archives are reused.
+    """
+    manifest = read_manifest(cache_dir)
+    parts_by_language = {}
+    for language in languages:
+        parts = _parts_to_rebuild(cache_dir, language, cache_count, manifest)
+        if parts:
+            parts_by_language[language] = parts
+    if not parts_by_language:
+        return
+
+    for language, parts in parts_by_language.items():
+        entry = manifest.get(language.value, {})
+        for pos in parts:
+            filepath = _get_cache_filepaths(cache_dir, language)[pos]
+            if entry and filepath.exists() and file_sha256(filepath) != entry["files"].get(pos):
+                print(f"Overwriting manually edited {str(filepath)}")
+
+    download_sources([_SOURCES[language][0] for language in parts_by_language], cache_dir, mirror)
+    if len(parts_by_language) == 1:
+        # single corpus isn't worth spawning a process
+        (language, parts), = parts_by_language.items()
+        _SOURCES[language][1](cache_dir, cache_count, parts)
+    else:
+        # Corpora are independent, parse them in separate processes
+        with ProcessPoolExecutor(max_workers=len(parts_by_language)) as executor:
+            futures = [executor.submit(_SOURCES[language][1], cache_dir, cache_count, parts)
+                       for language, parts in parts_by_language.items()]
+            for future in futures:
+                future.result()
+
+    for language in parts_by_language:
+        source, _ = _SOURCES[language]
+        manifest[language.value] = {
+            "source": source.filename,
+            "source_sha256": archive_sha256(source, cache_dir),
+            "cache_count": cache_count,
+            "parser_version": _PARSER_VERSION,
+            "files": {pos: file_sha256(filepath)
+                      for pos, filepath in _get_cache_filepaths(cache_dir, language).items()},
+        }
+    write_manifest(cache_dir, manifest)
+
+
+def _read_txt_cache(pos_filepaths: Dict[str, Path]) -> Tuple[Dict[str, List[str]], Dict[str, List[float]]]:
+    words_by_pos, frequencies_by_pos = {}, {}
+    for part_of_speech, filepath in pos_filepaths.items():
+        words, frequencies = [], []
+        with open(filepath, "r") as fh:
+            for line in fh:
+                word, _, freq = line.strip().partition("\t")
+                words.append(word)
+                frequencies.append(float(freq) if freq else 0.0)
+        words_by_pos[part_of_speech] = words
+        frequencies_by_pos[part_of_speech] = frequencies
+    return words_by_pos, frequencies_by_pos
+
+
+def _open_lexicon(cache_dir: Path, language: Language, pos_filepaths: Dict[str, Path]) -> PackedLexicon:
+    # .txt files stay the editable source of truth, compiled lexicon
+    # is regenerated whenever any of them is changed
+    lexicon_filepath = _get_lexicon_filepath(cache_dir, language)
+    if is_lexicon_stale(lexicon_filepath, list(pos_filepaths.values())):
+        print(f"Compiling {language.value} lexicon...")
+        words_by_pos, frequencies_by_pos = _read_txt_cache(pos_filepaths)
+        compile_lexicon(words_by_pos, lexicon_filepath, frequencies_by_pos)
+    return PackedLexicon(lexicon_filepath)
+
+
+class WordsCache:
+    """
+    Words of every language by part of speech, opened on first access.
+    Cache is checked (and rebuilt if needed) only when words of some language
+    are actually requested, so tasks not using words never touch it, and
+    lexicon of a language no task asked for is never opened.
+    `languages` are the ones the run may need: when the first of them turns
+    out to be missing, all of them are rebuilt at once, so their archives
+    are downloaded and parsed side by side.
+    """
+    def __init__(self,
+                 cache_dir: Path,
+                 cache_count: int = 100000,
+                 mirror: Optional[str] = None,
+                 languages: Iterable[Language] = (Language.RUSSIAN, Language.ENGLISH)):
+        self.cache_dir = cache_dir
+        self.cache_count = cache_count
+        self.mirror = mirror
+        self.languages = list(languages)
+        self._lexicons: Dict[Language, Lexicon] = {}
+
+    def __getitem__(self, language: Language) -> Lexicon:
+        if language not in self._lexicons:
+            if not is_cache_ready(self.cache_dir, [language], self.cache_count):
+                languages = [language] + [other for other in self.languages
+                                          if other is not language and other not in self._lexicons]
+                print("Words cache is not ready, rebuilding " + ", ".join(repr(l.value) for l in languages) + "...")
+                # languages already up to date are skipped by build_cache
+                build_cache(self.cache_dir, self.cache_count, self.mirror, languages)
+            pos_filepaths = _get_cache_filepaths(self.cache_dir, language)
+            words_by_pos = _open_lexicon(self.cache_dir, language, pos_filepaths).words_by_pos()
+            self._lexicons[language] = Lexicon(words_by_pos)
+        return self._lexicons[language]
+
+    def lexicon_filepath(self, language: Language) -> Path:
+        """
+        Compiled lexicon of the language, files derived from words
+        of the language are stale if they are older than it
+        """
+        self[language]
+        return _get_lexicon_filepath(self.cache_dir, language)
+
+    def load(self, language: Language, parts_of_speech: Iterable[str]) -> Lexicon:
+        """
+        Returns only requested parts of speech; words of each of them
+        are decoded only when task touches them. Indexes are shared
+        between all tasks using the same language.
+        """
+        parts_of_speech = list(parts_of_speech)
+        if not parts_of_speech:
+            return Lexicon({})
+        return self[language].restricted(parts_of_speech)
@@ -1,42 +1,51 @@
-import itertools
-from typing import List, Dict, Callable
-from dataclasses import dataclass
-from itertools import chain
+from typing import List, Dict, Iterable, Optional
 
-from tqdm import tqdm
+from utils.lexicon import Lexicon
+from utils.ranking import top_by_commonness
 
 
-def less_compare_words_backwards(word1, word2):
-    for letter1, letter2 in zip(word1[::-1], word2[::-1]):
-        if letter1 != letter2:
-            return letter1 < letter2
-    return len(word1) < len(word2)
-
-
-def find_words_with_common_part(
-        eligible_words: List[str],
-        extract_part: Callable[[str], str],
-        cluster_size_threshold: int = 4) -> List[List[str]]:
-    words_with_common_part = []
-    part = ""
-    current_streak = []
-    for word in tqdm(eligible_words, total=len(eligible_words)):
-        if part == extract_part(word):
-            current_streak.append(word)
-        else:
-            if len(current_streak) >= cluster_size_threshold:
-                words_with_common_part.append(current_streak)
-            part = extract_part(word)
-            current_streak = [word]
-    if len(current_streak) >= cluster_size_threshold:
-        words_with_common_part.append(current_streak)
-    return words_with_common_part
+def find_common_part_clusters(
+        lexicon: Lexicon,
+        part_sizes: Iterable[int] = range(3, 9),
+        from_end: bool = False,
+        part_is_word: bool = False,
+        cluster_size_threshold: int = 4) -> Dict[int, List[List[str]]]:
+    """
+    Clusters of words sharing prefix (or suffix if `from_end`) for every
+    part size at once, in one pass over the trie which is built once per lexicon.
+    With `part_is_word` common part should also be a noun itself and words of
+    all parts of speech are clustered, otherwise nouns only.
+    """
+    part_sizes = sorted(set(part_sizes))
+    clusters_by_size = {size: [] for size in part_sizes}
+    if not part_sizes:
+        return clusters_by_size
+    parts_of_speech = None if part_is_word else ["nouns"]
+    trie = lexicon.suffix_trie(parts_of_speech) if from_end else lexicon.prefix_trie(parts_of_speech)
+    is_part_eligible = None
+    if part_is_word:
+        nouns = lexicon.word_set(["nouns"])
+        is_part_eligible = (lambda part: part[::-1] in nouns) if from_end else (lambda part: part in nouns)
+    for size, cluster in trie.clusters(part_sizes[0], part_sizes[-1], cluster_size_threshold, is_part_eligible):
+        if size not in clusters_by_size:
+            continue
+        if part_is_word:
+            # part word may come from several parts of speech, keep it once
+            copies = 1
+            while copies < len(cluster) and cluster[copies] == cluster[0]:
+                copies += 1
+            cluster = cluster[copies - 1:]
+            if len(cluster) < cluster_size_threshold:
+                continue
+        clusters_by_size[size].append(cluster)
+    return clusters_by_size
 
 
 def find_words_with_common_prefix(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         prefix_size: int = 6,
-        cluster_size_threshold: int = 4) -> List[List[str]]:
+        cluster_size_threshold: int = 4,
+        top_k: Optional[int] = None) -> List[List[str]]:
     """
     Finds nouns starting with same prefix of a certain length (6 by default)
     Example:
@@ -53,17 +62,16 @@ def find_words_with_common_prefix(
     Using only nouns because verbs and adjectives add too many single-rooted
     garbage
     """
-    eligible_words = [word for word in all_words_by_class["nouns"]
-                      if len(word) >= prefix_size]
-    eligible_words = sorted(eligible_words)
-    return find_words_with_common_part(
-        eligible_words, lambda word: word[0:prefix_size], cluster_size_threshold)
+    clusters = find_common_part_clusters(
+        lexicon, [prefix_size], cluster_size_threshold=cluster_size_threshold)[prefix_size]
+    return top_by_commonness(lexicon, clusters, top_k)
 
 
 def find_words_with_common_suffix(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         suffix_size: int = 6,
-        cluster_size_threshold: int = 4) -> List[List[str]]:
+        cluster_size_threshold: int = 4,
+        top_k: Optional[int] = None) -> List[List[str]]:
     """
     Finds nouns ending with same suffix of a certain length (6 by default)
     Example:
@@ -73,46 +81,16 @@ def find_words_with_common_suffix(
     Mostly captures single-rooted words but there're a couple of interesting overlaps
     Using only nouns because verbs and adjectives add too manygarbage
     """
-    # Not the most effient way, but no need to optimize right now
-    eligible_words = sorted([word for word in
-                             all_words_by_class["nouns"] if len(word) >= suffix_size],
-                            key=lambda word: word[::-1])
-    return find_words_with_common_part(
-        eligible_words, lambda word: word[-suffix_size:], cluster_size_threshold)
-
-
-def find_words_with_common_word_part(
-        eligible_words: List[str],
-        eligible_part_words: List[str],
-        extract_part: Callable[[str], str],
-        compare_parts_less: Callable[[str, str], bool],
-        cluster_size_threshold: int = 4) -> List[List[str]]:
-    words_with_common_part = []
-    is_streak_started = False
-    current_streak = []
-    for word in tqdm(eligible_words, total=len(eligible_words)):
-        if is_streak_started:
-            if extract_part(word) == current_streak[0]:
-                current_streak.append(word)
-            else:
-                if len(current_streak) >= cluster_size_threshold:
-                    words_with_common_part.append(current_streak)
-                is_streak_started = False
-        while eligible_part_words and compare_parts_less(eligible_part_words[0], word):
-            eligible_part_words.pop(0)
-        if not eligible_part_words:
-            break
-        # not elif since we can end previous streak and start new one on the same time
-        if word == eligible_part_words[0]:
-            current_streak = [word]
-            is_streak_started = True
-    return words_with_common_part
+    clusters = find_common_part_clusters(
+        lexicon, [suffix_size], from_end=True, cluster_size_threshold=cluster_size_threshold)[suffix_size]
+    return top_by_commonness(lexicon, clusters, top_k)
 
 
 def find_words_with_common_word_prefix(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         prefix_size: int = 4,
-        cluster_size_threshold: int = 4) -> List[List[str]]:
+        cluster_size_threshold: int = 4,
+        top_k: Optional[int] = None) -> List[List[str]]:
     """
     Finds words starting with same prefix *which is also a valid word* of a
     certain length (4 by default)
@@ -125,23 +103,16 @@ def find_words_with_common_word_prefix(
         (БАЛЛ)ада, (БАЛЛ)аст, (БАЛЛ)он
     ...
     """
-    nouns = all_words_by_class["nouns"]
-    eligible_words = sorted([word for word in
-                             chain.from_iterable(all_words_by_class.values())
-                             if len(word) >= prefix_size])
-    eligible_starting_words = sorted([word for word in nouns if len(word) == prefix_size])
-    return find_words_with_common_word_part(
-        eligible_words,
-        eligible_starting_words,
-        lambda word: word[0:prefix_size],
-        lambda word1, word2: word1 < word2,
-        cluster_size_threshold)
+    clusters = find_common_part_clusters(
+        lexicon, [prefix_size], part_is_word=True, cluster_size_threshold=cluster_size_threshold)[prefix_size]
+    return top_by_commonness(lexicon, clusters, top_k)
 
 
 def find_words_with_common_word_suffix(
-        all_words_by_class: Dict[str, List[str]],
+        lexicon: Lexicon,
         suffix_size: int = 4,
-        cluster_size_threshold: int = 4) -> List[List[str]]:
+        cluster_size_threshold: int = 4,
+        top_k: Optional[int] = None) -> List[List[str]]:
     """
     Finds words ending with same suffix *which is also a valid word* of a
     certain length (4 by default)
@@ -152,16 +123,7 @@ def find_words_with_common_word_suffix(
     ...
     Using only nouns because verbs add too many garbage
     """
-    eligible_words = sorted([word for word in
-                             chain.from_iterable(all_words_by_class.values())
-                             if len(word) >= suffix_size],
-                            key=lambda word: word[::-1])
-    eligible_starting_words = sorted([word for word in
-                                      all_words_by_class["nouns"] if len(word) == suffix_size],
-                                     key=lambda word: word[::-1])
-    return find_words_with_common_word_part(
-        eligible_words,
-        eligible_starting_words,
-        lambda word: word[-suffix_size:],
-        less_compare_words_backwards,
-        cluster_size_threshold)
+    clusters = find_common_part_clusters(
+        lexicon, [suffix_size], from_end=True, part_is_word=True,
+        cluster_size_threshold=cluster_size_threshold)[suffix_size]
+    return top_by_commonness(lexicon, clusters, top_k)
@@ -1,24 +1,52 @@
 from tqdm import tqdm
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple
+from utils.aho_corasick import AhoCorasick
+from utils.lexicon import Lexicon
+from utils.ranking import TopK, remaining_best
+from utils.suffix_array import SuffixArray
+from utils.word_trie import WordTrie
 
 
 __all__ = ["find_double_sandwichable_words",
            "find_sandwichable_words_multistuffing"]
 
 
-def _find_words_with_sandwich_inside(
-        first_half: str,
-        second_half: str,
-        words_between_halfs: List[str],
-        long_words: List[str]):
-    result = []
-    for stuffing_word in words_between_halfs:
-        sandwich = first_half + stuffing_word + second_half
-        result.extend((long_word for long_word in long_words if long_word.find(sandwich) != -1))
-    return result
+def _index_sandwiches(
+        halves: Set[Tuple[str, str]],
+        stuffing_words: List[str],
+        long_words: List[str]) -> Dict[Tuple[str, str], List[str]]:
+    """
+    For every pair of halves finds long words containing
+    first_half + stuffing_word + second_half, long words go in order of
+    stuffing words, then in their own order (once per stuffing word).
+    Every first half is searched in suffix array of long words once,
+    then stuffing words and all second halves are matched after it.
+    """
+    seconds_by_first: Dict[str, Set[str]] = {}
+    for first_half, second_half in halves:
+        seconds_by_first.setdefault(first_half, set()).add(second_half)
+    stuffing_positions: Dict[str, List[int]] = {}
+    for i, word in enumerate(stuffing_words):
+        stuffing_positions.setdefault(word, []).append(i)
+    stuffing_trie = WordTrie(sorted(stuffing_positions))
+    index = SuffixArray(long_words)
 
+    found: Dict[Tuple[str, str], Set[Tuple[int, int]]] = {}
+    for first_half, second_halves in tqdm(seconds_by_first.items(), desc="Halves"):
+        second_lengths = {len(second_half) for second_half in second_halves}
+        for long_idx, offset, stuffing in index.gapped(first_half, stuffing_trie):
+            end = offset + len(first_half) + len(stuffing)
+            for second_length in second_lengths:
+                second_half = long_words[long_idx][end:end + second_length]
+                if len(second_half) == second_length and second_half in second_halves:
+                    found.setdefault((first_half, second_half), set()).update(
+                        (stuffing_idx, long_idx) for stuffing_idx in stuffing_positions[stuffing])
+    return {key: [long_words[long_idx] for _, long_idx in sorted(pairs)] for key, pairs in found.items()}
 
-def find_double_sandwichable_words(all_words_by_class: Dict[str, List[str]]) -> Dict[str, List[str]]:
+
+def find_double_sandwichable_words(lexicon: Lexicon,
+                                   top_k: Optional[int] = None,
+                                   max_rank: Optional[int] = None) -> Dict[str, List[str]]:
     """
     Finds all words which can be 'sandwiched' inside another valid word and
     the 'sandwiched' once more to form yet another valid word.
@@ -27,59 +55,33 @@ def find_double_sandwichable_words(all_words_by_class: Dict[str, List[str]]) ->
     лето: лепесток (ЛЕ-пес-ТО/к)
     река: перегрузка, перевозка (пе/РЕ-груз-КА, пе/РЕ-воз-КА)
     ...
+    `max_rank` limits search to that many most common nouns
     """
-    words = all_words_by_class["nouns"][:5000]
+    words = lexicon.rank_band(0, max_rank)["nouns"]
     small_words = [word for word in words if 3 <= len(word) <= 4]
     words_to_check = [word for word in words if 4 <= len(word) <= 6]
     long_words = [word for word in words if len(word) >= 7]
-    sandwichable_words = {}
-    for word in tqdm(words_to_check, total=len(words_to_check)):
+    halves = {(word[:split_idx], word[split_idx:]) for word in words_to_check for split_idx in range(2, len(word)-1)}
+    sandwiches_by_halves = _index_sandwiches(halves, small_words, long_words)
+    sandwichable_words = TopK(top_k)
+    # words are checked from the most common ones, so search can stop
+    # as soon as none of remaining words can get into top
+    frequencies = [lexicon.frequency(word, ["nouns"]) for word in words_to_check]
+    bounds = remaining_best(frequencies)
+    for word_idx, word in enumerate(tqdm(words_to_check, total=len(words_to_check))):
+        if not sandwichable_words.can_improve(bounds[word_idx]):
+            break
+        word_sandwiches = None
         for split_idx in range(2, len(word)-1):
-            first_half, second_half = word[:split_idx], word[split_idx:]
-            sandwiches = _find_words_with_sandwich_inside(first_half, second_half, small_words, long_words)
+            sandwiches = sandwiches_by_halves.get((word[:split_idx], word[split_idx:]))
             if sandwiches:
-                sandwichable_words[word] = sandwiches
-    return sandwichable_words
-
-
-def _split_inplace(words: List[str], letters: str):
-    result = {"": words}
-    for new_letter in letters:
-        split_update = {}
-        for existing_letters, words in result.items():
-            dont_have_new_letter, have_new_letter = [], []
-            for word in words:
-                (dont_have_new_letter, have_new_letter)[new_letter in word].append(word)
-            result[existing_letters] = dont_have_new_letter
-            split_update[existing_letters + new_letter] = have_new_letter
-        result.update(split_update)
-    return result
-
-
-def _find_contained_words(containers_split: Dict[str, List[str]],
-                          parts_split: Dict[str, List[str]],
-                          min_num_threshold: int):
-    total_result = {}
-    for letters_in_containers_split, container_words in containers_split.items():
-        parts_to_search_from = []
-        for letter in letters_in_containers_split:
-            for letters_in_parts_split, parts_words in parts_split.items():
-                if letter in letters_in_parts_split:
-                    parts_to_search_from.append(parts_words)
-        parts_to_search_from.append(parts_split[""])
-
-        for container_word in tqdm(container_words,
-                                   desc=letters_in_containers_split + " words",
-                                   total=len(container_words)):
-            result = []
-            for parts_words in parts_to_search_from:
-                result.extend(filter(lambda word: word in container_word, parts_words))
-            if len(result) >= min_num_threshold:
-                total_result[container_word] = result
-    return total_result
+                word_sandwiches = sandwiches
+        if word_sandwiches:
+            sandwichable_words.push(frequencies[word_idx], (word, word_sandwiches))
+    return dict(sandwichable_words.items())
 
 
-def find_sandwichable_words_multistuffing(all_words_by_class: Dict[str, List[str]]) -> Dict[str, List[str]]:
+def find_sandwichable_words_multistuffing(lexicon: Lexicon, top_k: Optional[int] = None) -> Dict[str, List[str]]:
     """
     Finds words containing at least 4 other words inside them (possibly with intersection)
     Example:
@@ -91,15 +93,20 @@ def find_sandwichable_words_multistuffing(all_words_by_class: Dict[str, List[str
         транСПОРт, транСПОРТ, трансПОРТ, ТРАНСпорт
     ...
     """
-    nouns = all_words_by_class["nouns"]
+    nouns = lexicon["nouns"]
     possible_container_words = [word for word in nouns if 6 < len(word)]
-    possible_container_words.extend([word for word in all_words_by_class["verbs"] if 6 < len(word)])
-    possible_container_words.extend([word for word in all_words_by_class["adjectives"] if 6 < len(word)])
+    possible_container_words.extend([word for word in lexicon["verbs"] if 6 < len(word)])
+    possible_container_words.extend([word for word in lexicon["adjectives"] if 6 < len(word)])
     possible_part_words = [word for word in nouns if 2 < len(word) < 6 and word != "ост" and word != "ость"]
-    # Using presplitting for optimization:
-    # long words without certain letter can't contain small words with this letter
-    container_words_split = _split_inplace(list(possible_container_words), "оаеи")
-    part_words_split = _split_inplace(list(possible_part_words), "оаеи")
-    result = _find_contained_words(container_words_split, part_words_split, 4)
-    return result
+    automaton = AhoCorasick(possible_part_words)
+    part_order = {word: i for i, word in enumerate(automaton.words)}
+    result = {}
+    for container_word in tqdm(possible_container_words, total=len(possible_container_words)):
+        contained = automaton.contained(container_word)
+        if len(contained) >= 4:
+            result[container_word] = sorted(contained, key=part_order.get)
+    ranked = TopK(top_k)
+    for container_word, part_words in result.items():
+        ranked.push(lexicon.frequency(container_word), (container_word, part_words))
+    return dict(ranked.items())
 
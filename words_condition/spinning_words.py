@@ -1,10 +1,21 @@
 from tqdm import tqdm
-from typing import Set, Dict, List
+from typing import List, Optional, Dict, Iterator
+from utils.lexicon import Lexicon
+from utils.ranking import top_by_commonness
 
-__all__ = ["find_spinning_words"]
+__all__ = ["find_spinning_words", "find_semordnilaps", "find_anagram_families"]
 
 
-def find_spinning_words(all_words_by_class: Dict[str, List[str]]) -> Set[frozenset]:
+def _distinct_groups(buckets: Dict[str, List[str]], min_length: int, max_length: int) -> Iterator[List[str]]:
+    for words in tqdm(buckets.values(), total=len(buckets)):
+        if not min_length <= len(words[0]) <= max_length:
+            continue
+        group = list(dict.fromkeys(words))
+        if len(group) > 1:
+            yield group
+
+
+def find_spinning_words(lexicon: Lexicon, top_k: Optional[int] = None) -> List[frozenset]:
     """
     Finds all words which after being cycled form new valid words.
     Example:
@@ -13,16 +24,28 @@ def find_spinning_words(all_words_by_class: Dict[str, List[str]]) -> Set[frozens
     казна, наказ
     ...
     """
-    nouns = all_words_by_class["nouns"]
-    possible_spinning_words = [word for word in nouns if 3 < len(word) < 8]
-    result = set()
-    for word in tqdm(possible_spinning_words, total=len(possible_spinning_words)):
-        chain = {word}
-        cycled_word = word
-        for _ in range(len(word) - 1):
-            cycled_word = cycled_word[1:] + cycled_word[0]
-            if cycled_word in possible_spinning_words:
-                chain.add(cycled_word)
-        if len(chain) > 1:
-            result.add(frozenset(chain))
-    return result
+    # Words are grouped by their least rotation, which all rotations of a word share
+    groups = _distinct_groups(lexicon.by_rotation(), 4, 7)
+    return top_by_commonness(lexicon, map(frozenset, groups), top_k)
+
+
+def find_semordnilaps(lexicon: Lexicon, top_k: Optional[int] = None) -> List[List[str]]:
+    """
+    Finds words which spelled backwards form another valid word.
+    Example:
+    кот, ток
+    сон, нос
+    ...
+    """
+    return top_by_commonness(lexicon, _distinct_groups(lexicon.by_reversal(), 3, 100), top_k)
+
+
+def find_anagram_families(lexicon: Lexicon, top_k: Optional[int] = None) -> List[List[str]]:
+    """
+    Finds groups of words consisting of the same letters.
+    Example:
+    апельсин, спаниель
+    автор, отвар, рвота, тавро
+    ...
+    """
+    return top_by_commonness(lexicon, _distinct_groups(lexicon.by_signature(), 3, 100), top_k)
@@ -1,12 +1,20 @@
-from collections import defaultdict
-from typing import List, Dict
+from typing import List, Optional, Tuple
 from tqdm import tqdm
+from utils.letter_dag import LetterDag
+from utils.lexicon import Lexicon
+from utils.ranking import top_by_commonness
 
 
 __all__ = ["find_word_chains"]
 
 
-def find_word_chains(all_words_by_class: Dict[str, List[str]]) -> List[List[str]]:
+def find_word_chains(lexicon: Lexicon,
+                     top_k: Optional[int] = None,
+                     start_lengths: Tuple[int, int] = (3, 5),
+                     max_length: Optional[int] = 9,
+                     insert_anywhere: bool = False,
+                     parts_of_speech: Optional[List[str]] = None,
+                     chain_length_threshold: int = 4) -> List[List[str]]:
     """
     Finds all unique chains of words which can be formed by adding
     one letter to preceding word.
@@ -17,46 +25,13 @@ def find_word_chains(all_words_by_class: Dict[str, List[str]]) -> List[List[str]
         those are different chains since they are different in at least one word
     ...
     """
-    words = all_words_by_class["nouns"]
-    russian_letters = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
-    nouns_by_length = defaultdict(list)
-    for word in words:
-        if 3 <= len(word) <= 9:
-            nouns_by_length[len(word)].append(word)
-    chains = []
-    chain_length_threshold = 4
-
-    def subsearch(current_chain: List[str]):
-        subword = current_chain[-1]
-        found_longer_chain = False
-        for letter in russian_letters:
-            subword_prefixed = letter + subword
-            subword_suffixed = subword + letter
-            for word in nouns_by_length[len(subword_prefixed)]:
-                if word == subword_prefixed:
-                    found_longer_chain = True
-                    subsearch(current_chain + [subword_prefixed])
-                if word == subword_suffixed:
-                    found_longer_chain = True
-                    subsearch(current_chain + [subword_suffixed])
-        if not found_longer_chain and len(current_chain) >= chain_length_threshold:
-            chains.append(current_chain)
-
-    for word in tqdm(nouns_by_length[3],
-                     total=len(nouns_by_length[3]),
-                     desc="Words of lenght 3"):
-        subsearch([word])
-    for word in tqdm(nouns_by_length[4],
-                     total=len(nouns_by_length[4]),
-                     desc="Words of lenght 4"):
-        if any(word == chain[1] for chain in chains):
-            continue
-        subsearch([word])
-    for word in tqdm(nouns_by_length[5],
-                     total=len(nouns_by_length[5]),
-                     desc="Words of lenght 5"):
-        if any(word == chain[1] or word == chain[2] for chain in chains):
-            continue
-        subsearch([word])
-
-    return chains
+    # Chains start from words of given lengths which can't be made of a shorter
+    # word and go on while a letter can be added (at the ends only unless
+    # `insert_anywhere`), every such path of the graph is a chain
+    min_length, max_start_length = start_lengths
+    words = [word for word in lexicon.words(parts_of_speech)
+             if len(word) >= min_length and (max_length is None or len(word) <= max_length)]
+    graph = LetterDag(words, ends_only=not insert_anywhere)
+    starts = [word for word in graph.words if len(word) <= max_start_length and graph.is_source(word, False)]
+    chains = graph.maximal_paths(tqdm(starts, total=len(starts), desc="Chains"), False, chain_length_threshold)
+    return top_by_commonness(lexicon, chains, top_k)
@@ -1,18 +1,141 @@
-import itertools
-
 from tqdm import tqdm
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.lexicon import Lexicon
+from utils.ranking import TopK, remaining_best
 
 __all__ = ["find_magic_word_squares"]
 
 
-def find_magic_word_squares(all_words_by_class: Dict[str, List[str]],
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def _iterate_bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class _LetterBitsets:
+    """
+    For every position and letter - bitset of words (by index) having
+    that letter at that position. Words matching any partially filled
+    row are then found by AND-ing a few bitsets.
+    """
+    def __init__(self, words: Sequence[str], length: int):
+        bitmaps: List[Dict[str, bytearray]] = [{} for _ in range(length)]
+        size = (len(words) + 7) // 8
+        for i, word in enumerate(words):
+            for position, letter in enumerate(word):
+                bitmap = bitmaps[position].get(letter)
+                if bitmap is None:
+                    bitmap = bitmaps[position][letter] = bytearray(size)
+                bitmap[i >> 3] |= 1 << (i & 7)
+        self.all = (1 << len(words)) - 1
+        self._bits = [{letter: int.from_bytes(bitmap, "little") for letter, bitmap in by_letter.items()}
+                      for by_letter in bitmaps]
+
+    def matching(self, cells: Sequence[Optional[str]]) -> int:
+        mask = self.all
+        for position, letter in enumerate(cells):
+            if letter is not None:
+                mask &= self._bits[position].get(letter, 0)
+                if not mask:
+                    break
+        return mask
+
+
+class _SquareSolver:
+    """
+    Fills square grid with words, rows (and columns for double squares)
+    are variables with bitset domains of words matching already known cells.
+    Every step fills the variable having the fewest candidates left and
+    stops as soon as some variable has none. Used words are excluded from
+    domains, diagonal readings (for fullmagic) are checked the same way.
+    """
+    def __init__(self, words: Sequence[str], length: int, double: bool, diagonal_words: Optional[Sequence[str]]):
+        self.words = words
+        self.length = length
+        self.double = double
+        self.bitsets = _LetterBitsets(words, length)
+        self.diagonal_bitsets = _LetterBitsets(diagonal_words, length) if diagonal_words is not None else None
+        self.used = 0
+        # (is column, index) -> word index
+        self.assigned: Dict[Tuple[bool, int], int] = {}
+        self.variables = [(False, i) for i in range(length)]
+        if double:
+            self.variables += [(True, i) for i in range(length)]
+
+    def _cell(self, r: int, c: int) -> Optional[str]:
+        if (False, r) in self.assigned:
+            return self.words[self.assigned[(False, r)]][c]
+        # in symmetric square column c is row c
+        crossing = (True, c) if self.double else (False, c)
+        if crossing in self.assigned:
+            return self.words[self.assigned[crossing]][r]
+        return None
+
+    def _domain(self, variable: Tuple[bool, int]) -> int:
+        is_column, idx = variable
+        if is_column:
+            cells = [self._cell(r, idx) for r in range(self.length)]
+        else:
+            cells = [self._cell(idx, c) for c in range(self.length)]
+        return self.bitsets.matching(cells) & ~self.used
+
+    def _assign(self, variable: Tuple[bool, int], word_idx: int):
+        self.assigned[variable] = word_idx
+        self.used |= 1 << word_idx
+
+    def _unassign(self, variable: Tuple[bool, int]):
+        self.used &= ~(1 << self.assigned.pop(variable))
+
+    def _diagonals_possible(self) -> bool:
+        if self.diagonal_bitsets is None:
+            return True
+        n = self.length
+        main = [self._cell(i, i) for i in range(n)]
+        anti = [self._cell(i, n - i - 1) for i in range(n)]
+        # no need to check bottom-left to top-right as it is reversed top-right to bottom-left
+        return any(self.diagonal_bitsets.matching(cells) for cells in (main, main[::-1], anti))
+
+    def solve(self, first_word_idx: int):
+        self._assign(self.variables[0], first_word_idx)
+        yield from self._search()
+        self._unassign(self.variables[0])
+
+    def _search(self):
+        if not self._diagonals_possible():
+            return
+        best, best_domain, best_count = None, 0, 0
+        for variable in self.variables:
+            if variable in self.assigned:
+                continue
+            domain = self._domain(variable)
+            count = _popcount(domain)
+            if count == 0:
+                return
+            if best is None or count < best_count:
+                best, best_domain, best_count = variable, domain, count
+        if best is None:
+            yield tuple(self.words[self.assigned[(False, r)]] for r in range(self.length))
+            return
+        for word_idx in _iterate_bits(best_domain):
+            self._assign(best, word_idx)
+            yield from self._search()
+            self._unassign(best)
+
+
+def find_magic_word_squares(lexicon: Lexicon,
                             length: int = 5,
-                            fullmagic=False) -> List[List[str]]:
+                            fullmagic=False,
+                            top_k: Optional[int] = None,
+                            double: bool = False) -> List[List[str]]:
     """
     Finds all word squares which when being transposed form the same squares.
     (or, alternatively, which read the same from left to right and from top to bottom).
-    Default size of square is 5.
+    Default size of square is 5, sizes 3-7 are practical.
     Example:
     бачок
     акула
@@ -21,65 +144,20 @@ def find_magic_word_squares(all_words_by_class: Dict[str, List[str]],
     какао
     ...
     """
-    all_words = all_words_by_class["nouns"]
-    all_words = [word for word in all_words if len(word) == length]
-    total_result = []
-
-    def _magic_word_squares_recursive(words, current_chain):
-
-        def filter_have_possible_further_letters(words, current_chain, current_depth):
-            return [word for word in words if word[current_depth - 1] in current_chain[-1][current_depth + 1:]]
-
-        def filter_against_words_already_in_chain(words, current_chain, current_depth):
-            result = []
-            for word in words:
-                for d, word_already_in_chain in enumerate(current_chain):
-                    if word[d] != word_already_in_chain[current_depth]:
-                        break
-                else:
-                    result.append(word)
-            return result
-
-        current_depth = len(current_chain)
-        if current_depth == 0:
-            for next_word_in_chain in tqdm(words, total=len(words)):
-                possible_further_words = filter_have_possible_further_letters(words, [next_word_in_chain], 0)
-                _magic_word_squares_recursive(possible_further_words, [next_word_in_chain])
-        elif current_depth == length - 1:
-            possible_next_step_words = filter_against_words_already_in_chain(words, current_chain, current_depth)
-            for next_word_in_chain in possible_next_step_words:
-                total_result.append(tuple(current_chain + [next_word_in_chain]))
-        else:
-            possible_further_words = filter_have_possible_further_letters(words, current_chain, current_depth)
-            possible_next_step_words = filter_against_words_already_in_chain(words, current_chain, current_depth)
-            for next_word_in_chain in possible_next_step_words:
-                _magic_word_squares_recursive(possible_further_words, current_chain + [next_word_in_chain])
-
-    _magic_word_squares_recursive(all_words, [])
-
-    def filter_chains_with_duplicate_words(total_result):
-        result = []
-        for chain in total_result:
-            for pair in itertools.combinations(chain, r=2):
-                if pair[0] == pair[1]:
-                    break
-            else:
-                result.append(chain)
-        return result
-
-    total_result = filter_chains_with_duplicate_words(total_result)
-
-    if fullmagic:
-        # fullmagic means diagonals also form words
-        # No russian fullmagic squares found :(
-        result = []
-        for chain in total_result:
-            diag_tl_br = "".join((word[i] for i, word in enumerate(chain)))
-            diag_br_tl = "".join((word[len(chain) - i - 1] for i, word in enumerate(reversed(chain))))
-            diag_tr_bl = "".join((word[len(chain) - i - 1] for i, word in enumerate(chain)))
-            # no need to check diag_bl_tr as they are necessary palindromes with diag_tr_bl
-            if diag_tr_bl in all_words or diag_tl_br in all_words or diag_br_tl in all_words:
-                result.append(chain)
-        total_result = result
-
-    return total_result
+    # fullmagic means diagonals also form words, double means columns are
+    # words too but not the same ones as rows (rows are returned then)
+    # No russian fullmagic squares found :(
+    words = list(dict.fromkeys(lexicon.by_length(["nouns"]).get(length, [])))
+    total_result = TopK(top_k)
+    if not words:
+        return total_result.items()
+    solver = _SquareSolver(words, length, double, words if fullmagic else None)
+    # square is not more common than its first word, and first words go
+    # from the most common ones
+    bounds = remaining_best([lexicon.frequency(word, ["nouns"]) for word in words])
+    for word_idx, word in enumerate(tqdm(words, total=len(words))):
+        if not total_result.can_improve(bounds[word_idx]):
+            break
+        for square in solver.solve(word_idx):
+            total_result.push(lexicon.commonness(square, ["nouns"]), square)
+    return total_result.items()